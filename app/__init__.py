@@ -1,15 +1,33 @@
 """Flask application initialization"""
+import time
+
+_import_started = time.perf_counter()
+
 from flask import Flask
 from app.config import Config
 
+_import_finished = time.perf_counter()
+
 def create_app():
     """Create and configure Flask application"""
-    app = Flask(__name__)
-    app.config.from_object(Config)
+    from app.utils.startup import StartupReport
     
+    report = StartupReport(started=_import_started)
+    report.add_phase('flask import', _import_finished - _import_started)
+
+    with report.phase('app'):
+        app = Flask(__name__)
+        app.config.from_object(Config)
+
     # Register blueprints
-    from app.routes import bp
-    app.register_blueprint(bp)
-    
-    return app
+    with report.phase('routes'), report.tracing_imports():
+        from app.routes import bp, master_qr_codes
+        app.register_blueprint(bp)
 
+    # Render the master page QR codes once up front when the public URL is known
+    if Config.PUBLIC_BASE_URL:
+        with report.phase('qr warm-up'):
+            master_qr_codes(Config.PUBLIC_BASE_URL.rstrip('/'))
+
+    app.extensions['startup_report'] = report.finish(Config.STARTUP_BUDGET_MS)
+    return app
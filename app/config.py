@@ -16,14 +16,96 @@ class Config:
         'https://novalabs.skedda.com/ical?k=6uXn10Wdzz_QolZkWb4IduCRE8QKY2M1&i=774516'
     )
     
+    # Skedda reservations starting outside this window (days before/after
+    # today) are skipped while parsing; a negative value keeps everything
+    SKEDDA_HORIZON_PAST_DAYS: int = int(os.getenv('SKEDDA_HORIZON_PAST_DAYS', '31'))
+    SKEDDA_HORIZON_FUTURE_DAYS: int = int(os.getenv('SKEDDA_HORIZON_FUTURE_DAYS', '366'))
+    
+    # Recurring (RRULE) reservations are expanded per query window; a window
+    # without an end stops RECURRENCE_HORIZON_DAYS after its start. Expansions
+    # are memoized per UID and window, up to RECURRENCE_CACHE_SIZE of them.
+    RECURRENCE_HORIZON_DAYS: int = int(os.getenv('RECURRENCE_HORIZON_DAYS', '90'))
+    RECURRENCE_CACHE_SIZE: int = int(os.getenv('RECURRENCE_CACHE_SIZE', '4096'))
+    
+    # Extra or replacement feeds as a JSON list of
+    # {"name", "type" (wild-apricot | skedda | ical), "url", "refresh", "label", "timeout"};
+    # empty means the two URLs above
+    FEEDS: str = os.getenv('FEEDS', '')
+    
+    # Threads fetching feeds concurrently (per worker)
+    FETCH_WORKERS: int = int(os.getenv('FETCH_WORKERS', '4'))
+    
+    # A Skedda reservation in the same space as a Wild Apricot event, starting
+    # within DEDUP_WINDOW_MINUTES of it and with a title at least
+    # DEDUP_TITLE_SIMILARITY (0-1) alike, is shown as part of the event
+    DEDUP_ENABLED: bool = os.getenv('DEDUP_ENABLED', 'true').lower() == 'true'
+    DEDUP_WINDOW_MINUTES: float = float(os.getenv('DEDUP_WINDOW_MINUTES', '15'))
+    DEDUP_TITLE_SIMILARITY: float = float(os.getenv('DEDUP_TITLE_SIMILARITY', '0.6'))
+    
+    # Wild Apricot events have no end time; room occupancy (/availability)
+    # assumes they take this long unless a reservation folded into them has one
+    DEFAULT_EVENT_MINUTES: float = float(os.getenv('DEFAULT_EVENT_MINUTES', '120'))
+    
     # Timeout settings (seconds)
     FETCH_TIMEOUT: int = int(os.getenv('FETCH_TIMEOUT', '10'))
     
+    # A refresh waits at most FETCH_DEADLINE for all sources together; each
+    # source also has its own budget (capped by the deadline). Sources that
+    # miss it keep serving their last good data.
+    FETCH_DEADLINE: float = float(os.getenv('FETCH_DEADLINE', str(FETCH_TIMEOUT)))
+    WILD_APRICOT_TIMEOUT: float = float(os.getenv('WILD_APRICOT_TIMEOUT', str(FETCH_TIMEOUT)))
+    SKEDDA_TIMEOUT: float = float(os.getenv('SKEDDA_TIMEOUT', str(FETCH_TIMEOUT)))
+    
+    # Circuit breaker per upstream: after this many failed fetches in a row
+    # the source is not called for CIRCUIT_RESET_TIMEOUT seconds (doubling
+    # while it keeps failing, up to CIRCUIT_MAX_RESET_TIMEOUT)
+    CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '3'))
+    CIRCUIT_RESET_TIMEOUT: float = float(os.getenv('CIRCUIT_RESET_TIMEOUT', '60'))
+    CIRCUIT_MAX_RESET_TIMEOUT: float = float(os.getenv('CIRCUIT_MAX_RESET_TIMEOUT', '600'))
+    
+    # Data snapshot settings (seconds)
+    # Snapshots older than the TTL are stale and trigger an early refresh;
+    # the background refresher fetches every SNAPSHOT_REFRESH_INTERVAL.
+    SNAPSHOT_TTL: int = int(os.getenv('SNAPSHOT_TTL', '300'))
+    SNAPSHOT_REFRESH_INTERVAL: int = int(os.getenv('SNAPSHOT_REFRESH_INTERVAL', '120'))
+    
+    # Share one snapshot file between gunicorn workers so only one of them
+    # fetches and parses the feeds per refresh
+    SNAPSHOT_SHARED: bool = os.getenv('SNAPSHOT_SHARED', 'true').lower() == 'true'
+    
+    # Keep the last good snapshot on disk so a restarted worker can serve it
+    # right away (and through upstream outages). The file is unpickled, so
+    # it lives in the app's own instance/ directory (created 0700) rather
+    # than a shared temp directory; files and directories owned by another
+    # user are refused
+    SNAPSHOT_PERSIST: bool = os.getenv('SNAPSHOT_PERSIST', 'true').lower() == 'true'
+    SNAPSHOT_PATH: str = os.getenv(
+        'SNAPSHOT_PATH',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'snapshot.pickle')
+    )
+    
+    # create_app logs a warning when worker startup takes longer (milliseconds)
+    STARTUP_BUDGET_MS: int = int(os.getenv('STARTUP_BUDGET_MS', '1000'))
+    
     # Default settings
     DEFAULT_FORMAT: str = 'desktop'
     DEFAULT_SOURCE: str = 'all'
     DEFAULT_DATE_RANGE: str = 'this-week'
     
+    # Serve Prometheus text metrics at /metrics (per worker)
+    METRICS_ENABLED: bool = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    
+    # Rendered /display pages kept in memory per worker
+    PAGE_CACHE_SIZE: int = int(os.getenv('PAGE_CACHE_SIZE', '128'))
+    
+    # Kiosk update stream: how often browsers reconnect to check for
+    # changed day sections (milliseconds)
+    SSE_RETRY_MS: int = int(os.getenv('SSE_RETRY_MS', '30000'))
+    
+    # /api/items page size (default, and the most a client may ask for)
+    API_PAGE_SIZE: int = int(os.getenv('API_PAGE_SIZE', '100'))
+    API_MAX_PAGE_SIZE: int = int(os.getenv('API_MAX_PAGE_SIZE', '1000'))
+    
     # Filter past events by default
     FILTER_PAST_EVENTS: bool = os.getenv('FILTER_PAST_EVENTS', 'true').lower() == 'true'
     
@@ -31,6 +113,13 @@ class Config:
     QR_CODE_ERROR_CORRECTION: str = 'M'  # Medium error correction
     QR_CODE_SIZE: int = 10
     QR_CODE_BORDER: int = 4
+    # 'png' (Pillow) or 'svg' (smaller, no image encoding)
+    QR_CODE_FORMAT: str = os.getenv('QR_CODE_FORMAT', 'png').lower()
+    QR_CACHE_SIZE: int = int(os.getenv('QR_CACHE_SIZE', '256'))
+    
+    # Public base URL (e.g. https://example.org/events); when set, the
+    # master page QR codes are rendered at startup
+    PUBLIC_BASE_URL: str = os.getenv('PUBLIC_BASE_URL', '')
     
     # Logging
     LOG_LEVEL: str = os.getenv('LOG_LEVEL', 'INFO')
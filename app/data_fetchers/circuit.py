@@ -0,0 +1,97 @@
+"""Per-upstream circuit breaker"""
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Stops calling an upstream after repeated failures.
+
+    closed:    calls go through; failure_threshold failures in a row open it
+    open:      calls are refused until reset_timeout has passed
+    half-open: one trial call is let through; success closes the circuit,
+               failure opens it again with the timeout doubled (up to
+               max_reset_timeout)
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        reset_timeout: float = 60,
+        max_reset_timeout: Optional[float] = None
+    ):
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max(max_reset_timeout or reset_timeout, reset_timeout)
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._current_timeout = reset_timeout
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._retry_in() <= 0:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """True if a call may go out now (claims the trial call when half-open)"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and self._retry_in() > 0:
+                return False
+            if self._trial_running:
+                return False
+            self._state = self.HALF_OPEN
+            self._trial_running = True
+            return True
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit lets a trial call through"""
+        with self._lock:
+            return max(self._retry_in(), 0.0) if self._state == self.OPEN else 0.0
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit for {self.name} closed again")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._current_timeout = self.reset_timeout
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN:
+                self._current_timeout = min(self._current_timeout * 2, self.max_reset_timeout)
+            elif self._failures < self.failure_threshold:
+                return
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._trial_running = False
+            logger.warning(
+                f"Circuit for {self.name} open after {self._failures} failures; "
+                f"next try in {self._current_timeout:.0f}s"
+            )
+
+    def stats(self) -> Dict[str, object]:
+        """State, consecutive failures and seconds until the next trial"""
+        return {'state': self.state, 'failures': self._failures, 'retry_in': self.retry_in()}
+
+    def _retry_in(self) -> float:
+        return self._opened_at + self._current_timeout - time.monotonic()
@@ -0,0 +1,141 @@
+"""Concurrent source fetching under one deadline with per-source budgets"""
+import logging
+import time
+from concurrent.futures import Executor, TimeoutError as FutureTimeoutError
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from app.data_fetchers.circuit import CircuitBreaker
+from app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class SourceStatus:
+    """Outcome of the latest fetch of one source"""
+
+    OK = 'ok'
+    ERROR = 'error'
+    TIMEOUT = 'timeout'
+    CIRCUIT_OPEN = 'circuit-open'
+
+    def __init__(
+        self,
+        name: str,
+        state: str,
+        elapsed: Optional[float] = None,
+        error: Optional[str] = None,
+        fetched_at: Optional[float] = None
+    ):
+        self.name = name
+        self.state = state
+        self.elapsed = elapsed
+        self.error = error
+        # When the data served for this source was fetched (a failed
+        # source keeps serving what it last fetched successfully)
+        self.fetched_at = fetched_at
+
+    @property
+    def ok(self) -> bool:
+        return self.state == self.OK
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since this source's data was fetched"""
+        if self.fetched_at is None:
+            return None
+        return max(time.time() - self.fetched_at, 0.0)
+
+    @property
+    def last_updated(self) -> Optional[datetime]:
+        """Local time this source's data was fetched"""
+        if self.fetched_at is None:
+            return None
+        return datetime.fromtimestamp(self.fetched_at)
+
+    def __repr__(self) -> str:
+        return f"SourceStatus({self.name!r}, {self.state!r})"
+
+
+class FetchResult:
+    """Data of the sources that completed in time, plus every source's status"""
+
+    def __init__(self):
+        self.data: Dict[str, List[Dict]] = {}
+        self.status: Dict[str, SourceStatus] = {}
+
+    @property
+    def any_ok(self) -> bool:
+        return any(status.ok for status in self.status.values())
+
+    def __repr__(self) -> str:
+        states = ', '.join(f"{name}={status.state}" for name, status in self.status.items())
+        return f"FetchResult({states})"
+
+
+def fetch_sources(
+    fetchers: Dict[str, Callable[[float], List[Dict]]],
+    executor: Executor,
+    deadline: float,
+    budgets: Optional[Dict[str, float]] = None,
+    flight: Optional[SingleFlight] = None,
+    breakers: Optional[Dict[str, CircuitBreaker]] = None
+) -> FetchResult:
+    """
+    Run every fetcher concurrently and collect what finishes in time.
+
+    Each fetcher is called with its budget (seconds) and should raise on
+    failure. A source gets min(its budget, deadline); the whole call
+    returns within deadline seconds no matter how many sources hang.
+    A source that fails or runs out of time is reported in the result's
+    status and left out of its data. Sources whose circuit breaker is open
+    are not called at all.
+    """
+    budgets = budgets or {}
+    breakers = breakers or {}
+    started = time.time()
+    result = FetchResult()
+    futures = {}
+    for name, fetch in fetchers.items():
+        breaker = breakers.get(name)
+        if breaker is not None and not breaker.allow():
+            result.status[name] = SourceStatus(
+                name, SourceStatus.CIRCUIT_OPEN, 0.0,
+                error=f"not retried for {breaker.retry_in():.0f}s after repeated failures"
+            )
+            continue
+        budget = min(budgets.get(name) or deadline, deadline)
+        if flight is not None:
+            future = flight.submit(name, executor, fetch, budget)
+        else:
+            future = executor.submit(fetch, budget)
+        futures[name] = (future, started + budget)
+
+    # Sources run in parallel, so waiting on each in deadline order never
+    # waits longer than the latest deadline
+    for name, (future, source_deadline) in sorted(futures.items(), key=lambda kv: kv[1][1]):
+        breaker = breakers.get(name)
+        try:
+            data = future.result(timeout=max(source_deadline - time.time(), 0))
+        except FutureTimeoutError:
+            logger.error(f"Fetching {name} did not finish within {source_deadline - started:.1f}s")
+            result.status[name] = SourceStatus(name, SourceStatus.TIMEOUT, time.time() - started,
+                                               error='timed out')
+        except Exception as e:
+            logger.error(f"Fetching {name} failed: {e}")
+            result.status[name] = SourceStatus(name, SourceStatus.ERROR, time.time() - started,
+                                               error=str(e) or e.__class__.__name__)
+        else:
+            result.data[name] = data
+            result.status[name] = SourceStatus(name, SourceStatus.OK, time.time() - started,
+                                               fetched_at=started)
+            if breaker is not None:
+                breaker.record_success()
+            continue
+        if breaker is not None:
+            breaker.record_failure()
+
+    # Report sources in the order they were given, whatever order they finished in
+    result.status = {name: result.status[name] for name in fetchers}
+    result.data = {name: result.data[name] for name in fetchers if name in result.data}
+    logger.info(f"Fetched sources in {time.time() - started:.2f}s: {result!r}")
+    return result
@@ -0,0 +1,122 @@
+"""Pooled HTTP session and conditional GETs for the data fetchers"""
+import hashlib
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, Generic, Optional, TypeVar
+from app.utils.metrics import timed
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Content-Manager/1.0'
+
+T = TypeVar('T')
+
+_session: Optional['requests.Session'] = None
+_session_pid: Optional[int] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> 'requests.Session':
+    """Keep-alive session shared by all fetchers (one per process)"""
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is not None and _session_pid == pid:
+        return _session
+    with _session_lock:
+        if _session is None or _session_pid != pid:
+            # requests is imported on first fetch, not at app startup
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers['User-Agent'] = USER_AGENT
+            _session, _session_pid = session, pid
+    return _session
+
+
+class ConditionalFetcher(Generic[T]):
+    """
+    Fetch one upstream resource with If-None-Match/If-Modified-Since and
+    reuse the previous parse result when the server answers 304 or sends
+    back a byte-identical body.
+    """
+
+    def __init__(self, name: str, parse: Callable[['requests.Response'], T]):
+        self.name = name
+        self._parse = parse
+        self._lock = threading.Lock()
+        self._url: Optional[str] = None
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._digest: Optional[str] = None
+        self._result: Optional[T] = None
+        self._stats = {
+            'requests': 0,
+            'not_modified': 0,
+            'bytes_transferred': 0,
+            'parsed': 0,
+            'parse_skipped': 0,
+        }
+
+    def fetch(self, url: str, timeout: float) -> T:
+        """GET url and return the parsed body; raises on HTTP/parse errors"""
+        with self._lock:
+            headers = {}
+            has_previous = self._result is not None and self._url == url
+            if has_previous and self._etag:
+                headers['If-None-Match'] = self._etag
+            if has_previous and self._last_modified:
+                headers['If-Modified-Since'] = self._last_modified
+
+            with timed(f"fetch.{self.name}"):
+                response = get_session().get(url, timeout=timeout, headers=headers)
+            self._stats['requests'] += 1
+
+            if response.status_code == 304 and has_previous:
+                self._stats['not_modified'] += 1
+                self._stats['parse_skipped'] += 1
+                logger.debug(f"{self.name}: not modified (304)")
+                return self._result
+
+            response.raise_for_status()
+            body = response.content
+            self._stats['bytes_transferred'] += _wire_bytes(response, body)
+
+            digest = hashlib.sha256(body).hexdigest()
+            etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+            if has_previous and digest == self._digest:
+                self._etag, self._last_modified = etag, last_modified
+                self._stats['parse_skipped'] += 1
+                logger.debug(f"{self.name}: body unchanged, skipping parse")
+                return self._result
+
+            with timed(f"parse.{self.name}"):
+                result = self._parse(response)
+            self._stats['parsed'] += 1
+            # Validators only go with a body that parsed: after a failed
+            # parse a 304 must not hand back the previous result
+            self._url, self._digest, self._result = url, digest, result
+            self._etag, self._last_modified = etag, last_modified
+            return result
+
+    def stats(self) -> Dict[str, int]:
+        """Request, transfer and parse counters"""
+        with self._lock:
+            return dict(self._stats)
+
+
+def _wire_bytes(response: 'requests.Response', body: bytes) -> int:
+    """Bytes read from the socket (compressed size when gzip was used)"""
+    try:
+        read = response.raw.tell()
+        if read:
+            return read
+    except Exception:
+        pass
+    return len(body)
@@ -0,0 +1,218 @@
+"""Streaming VEVENT parser for iCal feeds"""
+import logging
+import re
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# A content line split into (params, value); params keys are upper-case
+Property = Tuple[Dict[str, str], str]
+
+_ESCAPE_RE = re.compile(r'\\([\\;,nN])')
+
+# Property name of a content line: everything before the first ';' or ':'
+_NAME_RE = re.compile(r'[^;:]*')
+_WATCHED = frozenset('BEDRbedr')
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Split a stream of byte chunks into decoded lines without the line break"""
+    tail = b''
+    for chunk in chunks:
+        if not chunk:
+            continue
+        data = tail + chunk
+        lines = data.split(b'\n')
+        tail = lines.pop()
+        for line in lines:
+            yield line.rstrip(b'\r').decode('utf-8', errors='replace')
+    if tail:
+        yield tail.rstrip(b'\r').decode('utf-8', errors='replace')
+
+
+def unfold(lines: Iterable[str]) -> Iterator[str]:
+    """Join RFC 5545 folded lines (continuations start with a space or tab)"""
+    pending = None
+    for line in lines:
+        if line[:1] in (' ', '\t'):
+            if pending is not None:
+                pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending
+        pending = line
+    if pending is not None:
+        yield pending
+
+
+def split_content_line(line: str) -> Tuple[str, Dict[str, str], str]:
+    """Split 'NAME;PARAM=VAL:value' into name, params and raw value"""
+    in_quotes = False
+    colon = -1
+    for i, ch in enumerate(line):
+        if ch == '"':
+            in_quotes = not in_quotes
+        elif ch == ':' and not in_quotes:
+            colon = i
+            break
+    if colon < 0:
+        return line.upper(), {}, ''
+    head, value = line[:colon], line[colon + 1:]
+    parts = head.split(';')
+    params = {}
+    for part in parts[1:]:
+        key, _, param_value = part.partition('=')
+        params[key.upper()] = param_value.strip('"')
+    return parts[0].upper(), params, value
+
+
+def iter_vevents(
+    lines: Iterable[str],
+    horizon: Optional[Tuple[date, date]] = None
+) -> Iterator[Dict[str, List[Property]]]:
+    """
+    Yield the raw properties of each VEVENT as it completes.
+
+    With a horizon (inclusive), an event's lines are held unsplit until
+    its DTSTART date is known. Events inside the horizon are then split
+    into properties as before; events after it are skipped line by line
+    up to END:VEVENT. Events starting before it stay unsplit until
+    END:VEVENT: an RRULE or RDATE may still follow, and recurring events
+    are kept if they start before the horizon ends, since their
+    occurrences may fall inside it.
+    """
+    lo = hi = None
+    if horizon:
+        lo, hi = horizon[0].strftime('%Y%m%d'), horizon[1].strftime('%Y%m%d')
+    event: Optional[Dict[str, List[Property]]] = None  # a VEVENT being kept
+    pending: Optional[List[str]] = None  # unsplit lines of one not decided yet
+    skipping = False
+    depth = 0
+    day = None
+    recurring = False
+    for line in unfold(lines):
+        if not line:
+            continue
+        if pending is not None or skipping:
+            # Only BEGIN, END, DTSTART, RRULE and RDATE matter here
+            name = _NAME_RE.match(line).group().upper() if line[0] in _WATCHED else ''
+            if name == 'BEGIN':
+                depth += 1
+            elif name == 'END':
+                if depth:
+                    depth -= 1
+                elif split_content_line(line)[2].strip().upper() == 'VEVENT':
+                    if pending is not None and (day is None or recurring and day <= hi):
+                        yield _properties(pending)
+                    pending, skipping = None, False
+                    continue
+            elif name == 'DTSTART' and day is None and not depth:
+                _, params, value = split_content_line(line)
+                day = value.strip()[:8]
+                if day > hi:
+                    pending, skipping = None, True
+                elif day >= lo:
+                    # Inside the horizon: split from here on
+                    event, pending = _properties(pending), None
+                    event.setdefault('DTSTART', []).append((params, value))
+                    continue
+            elif (name == 'RRULE' or name == 'RDATE') and not depth:
+                recurring = True
+            if pending is not None:
+                pending.append(line)
+            continue
+
+        name, params, value = split_content_line(line)
+        if name == 'BEGIN':
+            if event is not None:
+                depth += 1  # nested component such as VALARM
+            elif value.upper() == 'VEVENT':
+                depth, day, recurring = 0, None, False
+                if lo is None:
+                    event = {}
+                else:
+                    pending = []
+            continue
+        if name == 'END' and event is not None:
+            if depth:
+                depth -= 1
+            elif value.upper() == 'VEVENT':
+                yield event
+                event = None
+            continue
+        if event is not None and not depth:
+            event.setdefault(name, []).append((params, value))
+
+
+def _properties(lines: List[str]) -> Dict[str, List[Property]]:
+    """Properties of one VEVENT's lines, leaving out nested components"""
+    event: Dict[str, List[Property]] = {}
+    depth = 0
+    for line in lines:
+        name, params, value = split_content_line(line)
+        if name == 'BEGIN':
+            depth += 1
+        elif name == 'END':
+            depth -= 1
+        elif not depth:
+            event.setdefault(name, []).append((params, value))
+    return event
+
+
+def decode_datetime(prop: Property):
+    """Decode a DATE or DATE-TIME value the way icalendar does"""
+    params, value = prop
+    value = value.strip()
+    if params.get('VALUE', '').upper() == 'DATE' or len(value) == 8:
+        return date(int(value[0:4]), int(value[4:6]), int(value[6:8]))
+    dt = datetime(
+        int(value[0:4]), int(value[4:6]), int(value[6:8]),
+        int(value[9:11]), int(value[11:13]), int(value[13:15])
+    )
+    import pytz  # loaded with the first timed value, not at startup
+    if value.endswith('Z'):
+        return pytz.utc.localize(dt)
+    tzid = params.get('TZID')
+    if tzid:
+        try:
+            return pytz.timezone(tzid).localize(dt)
+        except pytz.UnknownTimeZoneError:
+            logger.debug(f"Unknown TZID '{tzid}', using floating time")
+    return dt
+
+
+def decode_datetime_list(props: Optional[List[Property]]) -> List:
+    """
+    All values of a repeatable, comma-separated DATE/DATE-TIME property
+    (EXDATE, RDATE). PERIOD values contribute their start.
+    """
+    values = []
+    for params, value in props or ():
+        for part in value.split(','):
+            part = part.split('/', 1)[0].strip()
+            if part:
+                values.append(decode_datetime((params, part)))
+    return values
+
+
+def unescape_text(value: str) -> str:
+    """Undo iCal TEXT escaping (backslash, semicolon, comma, newline)"""
+    return _ESCAPE_RE.sub(lambda m: '\n' if m.group(1) in 'nN' else m.group(1), value)
+
+
+def first_value(event: Dict[str, List[Property]], name: str) -> Optional[str]:
+    """Raw value of the first occurrence of a property, or None if absent"""
+    props = event.get(name)
+    return props[0][1] if props else None
+
+
+def all_values(event: Dict[str, List[Property]], name: str):
+    """Raw value, or list of values when the property repeats, or None"""
+    props = event.get(name)
+    if not props:
+        return None
+    if len(props) == 1:
+        return props[0][1]
+    return [value for _, value in props]
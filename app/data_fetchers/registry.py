@@ -0,0 +1,200 @@
+"""
+Registry of upstream feeds.
+
+Each feed has a type (which parser reads it), a URL, an optional refresh
+interval and a display label. FEEDS in the environment is a JSON list:
+
+    [{"name": "main-hall", "type": "ical", "url": "https://...",
+      "refresh": 600, "label": "Main hall bookings"}, ...]
+
+Without FEEDS the registry holds the two classic feeds, 'wild-apricot'
+and 'skedda', built from WILD_APRICOT_URL and SKEDDA_ICAL_URL.
+"""
+import json
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from app.config import Config
+from app.data_fetchers import skedda, wild_apricot
+from app.data_fetchers.circuit import CircuitBreaker
+from app.data_fetchers.fetch_engine import FetchResult, fetch_sources
+from app.data_fetchers.http_client import ConditionalFetcher
+from app.processors.models import Source
+from app.utils.singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+# Feed type -> (record source, response parser); 'ical' is any iCal feed
+# read like the Skedda one
+FEED_TYPES: Dict[str, Tuple[Source, Callable[['requests.Response'], List[Dict]]]] = {
+    'wild-apricot': (Source.WILD_APRICOT, wild_apricot.parse_events_response),
+    'skedda': (Source.SKEDDA, skedda.parse_ical_response),
+    'ical': (Source.SKEDDA, skedda.parse_ical_response),
+}
+
+# Feed names appear in URLs (?source=) and metric labels
+_NAME_PATTERN = re.compile(r'^[a-z0-9][a-z0-9_-]*$')
+
+
+class Feed:
+    """One upstream feed and the conditional fetcher that reads it"""
+
+    def __init__(
+        self,
+        name: str,
+        type: str,
+        url: str,
+        refresh: Optional[float] = None,
+        label: Optional[str] = None,
+        timeout: Optional[float] = None
+    ):
+        if type not in FEED_TYPES:
+            raise ValueError(f"Feed {name!r}: unknown type {type!r} (expected one of {', '.join(FEED_TYPES)})")
+        if not _NAME_PATTERN.match(name):
+            raise ValueError(f"Feed name {name!r} must be lower-case letters, digits, '-' or '_'")
+        if not url:
+            raise ValueError(f"Feed {name!r} has no url")
+        self.name = name
+        self.type = type
+        self.url = url
+        self.refresh = refresh
+        self.label = label or name
+        self.source, self._parse_response = FEED_TYPES[type]
+        if timeout is None:
+            timeout = Config.WILD_APRICOT_TIMEOUT if self.source == Source.WILD_APRICOT else Config.SKEDDA_TIMEOUT
+        self.timeout = timeout
+        self._fetcher = ConditionalFetcher(name, self._parse)
+        self._records: Optional[List[Dict]] = None
+        self._fetched = 0.0
+
+    def __repr__(self) -> str:
+        return f"Feed({self.name!r}, {self.type!r}, {self.url!r})"
+
+    def fetch(self, timeout: float) -> List[Dict]:
+        """
+        Records of the feed; raises on HTTP/parse errors. Within refresh
+        seconds of the last successful fetch the previous records are
+        returned without a request.
+        """
+        if self.refresh and self._records is not None and time.monotonic() - self._fetched < self.refresh:
+            return self._records
+        records = self._fetcher.fetch(self.url, timeout)
+        self._records, self._fetched = records, time.monotonic()
+        logger.info(f"Fetched {len(records)} records from feed {self.name}")
+        return records
+
+    def stats(self) -> Dict[str, int]:
+        """Request, transfer and parse counters of the feed's fetcher"""
+        return self._fetcher.stats()
+
+    def _parse(self, response: 'requests.Response') -> List[Dict]:
+        records = self._parse_response(response)
+        for record in records:
+            record['feed'] = self.name
+        return records
+
+
+class FeedRegistry:
+    """
+    The configured feeds, fetched together on a bounded thread pool.
+    Each feed has its own circuit breaker (backoff) and single-flight key,
+    so one failing or slow feed doesn't hold up the others.
+    """
+
+    def __init__(self, feeds: Iterable[Feed], max_workers: int):
+        self.feeds: Dict[str, Feed] = {}
+        for feed in feeds:
+            if feed.name in self.feeds:
+                raise ValueError(f"Duplicate feed name {feed.name!r}")
+            self.feeds[feed.name] = feed
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(self.feeds))),
+            thread_name_prefix='feed-fetch'
+        )
+        self.flight = SingleFlight()
+        self.breakers = {
+            name: CircuitBreaker(
+                name,
+                failure_threshold=Config.CIRCUIT_FAILURE_THRESHOLD,
+                reset_timeout=Config.CIRCUIT_RESET_TIMEOUT,
+                max_reset_timeout=Config.CIRCUIT_MAX_RESET_TIMEOUT
+            )
+            for name in self.feeds
+        }
+
+    @property
+    def labels(self) -> Dict[str, str]:
+        """Display label per feed name"""
+        return {name: feed.label for name, feed in self.feeds.items()}
+
+    def fetch(self, deadline: float) -> FetchResult:
+        """Fetch every feed within deadline (see fetch_sources)"""
+        return fetch_sources(
+            {name: feed.fetch for name, feed in self.feeds.items()},
+            self.executor,
+            deadline=deadline,
+            budgets={name: feed.timeout for name, feed in self.feeds.items()},
+            flight=self.flight,
+            breakers=self.breakers
+        )
+
+
+def load_feeds(spec: Optional[str] = None) -> List[Feed]:
+    """
+    Feeds from a FEEDS JSON list, or the classic Wild Apricot and Skedda
+    feeds when it is empty. Raises ValueError for an invalid spec.
+    """
+    if not spec or not spec.strip():
+        return [
+            Feed('wild-apricot', 'wild-apricot', Config.WILD_APRICOT_URL,
+                 label='Wild Apricot events', timeout=Config.WILD_APRICOT_TIMEOUT),
+            Feed('skedda', 'skedda', Config.SKEDDA_ICAL_URL,
+                 label='Skedda reservations', timeout=Config.SKEDDA_TIMEOUT),
+        ]
+    try:
+        entries = json.loads(spec)
+    except ValueError as e:
+        raise ValueError(f"FEEDS is not valid JSON: {e}") from e
+    if not isinstance(entries, list) or not entries:
+        raise ValueError("FEEDS must be a non-empty JSON list of feeds")
+
+    feeds = []
+    per_type: Dict[str, int] = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise ValueError(f"FEEDS entry {entry!r} is not an object")
+        feed_type = str(entry.get('type', '')).lower()
+        per_type[feed_type] = per_type.get(feed_type, 0) + 1
+        # Unnamed feeds are called after their type: 'ical', 'ical-2', ...
+        name = entry.get('name') or (feed_type if per_type[feed_type] == 1 else f"{feed_type}-{per_type[feed_type]}")
+        feeds.append(Feed(
+            name=str(name).lower(),
+            type=feed_type,
+            url=entry.get('url'),
+            refresh=_seconds(entry.get('refresh')),
+            label=entry.get('label'),
+            timeout=_seconds(entry.get('timeout'))
+        ))
+    return feeds
+
+
+def _seconds(value) -> Optional[float]:
+    return float(value) if value not in (None, '') else None
+
+
+@lru_cache(maxsize=1)
+def configured_feeds() -> Tuple[Feed, ...]:
+    """The feeds from Config.FEEDS (loaded once per process)"""
+    return tuple(load_feeds(Config.FEEDS))
+
+
+def source_names() -> Set[str]:
+    """Values ?source= may take: a record source or a feed name"""
+    return {source.value for source in Source} | {feed.name for feed in configured_feeds()}
+
@@ -0,0 +1,101 @@
+"""Snapshot file shared by all gunicorn workers on one host"""
+import logging
+import os
+import pickle
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX development machines
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class SharedSnapshotFile:
+    """
+    One pickled snapshot on local disk plus a lock file used to elect the
+    worker that refreshes it. Writers replace the file atomically, so
+    readers only ever see a complete snapshot, and a cheap os.stat() tells
+    them whether there is a new version to load.
+    Also used on its own (without the lock) to persist the last good
+    snapshot of a single worker.
+
+    Unpickling runs code, so the directory is created private (0700) and
+    a directory or file owned by another user is never trusted.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        if not _owned(os.stat(directory)):
+            raise PermissionError(f"Snapshot directory {directory} is owned by another user")
+
+    @staticmethod
+    def is_supported() -> bool:
+        """Leader election needs POSIX file locks"""
+        return fcntl is not None
+
+    def version_token(self) -> Optional[Tuple[int, int, int]]:
+        """Identify the file currently on disk without reading it"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def load(self):
+        """Deserialize the snapshot on disk, or None if missing/corrupt"""
+        try:
+            with open(self.path, 'rb') as f:
+                # Checked on the open file, so it can't be swapped in between
+                if not _owned(os.fstat(f.fileno())):
+                    logger.warning(f"Ignoring snapshot {self.path}: owned by another user")
+                    return None
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not read shared snapshot {self.path}: {e}")
+            return None
+
+    def save(self, snapshot):
+        """Write the snapshot atomically (temp file + rename)"""
+        directory = os.path.dirname(self.path) or '.'
+        fd, tmp_path = tempfile.mkstemp(prefix='.snapshot-', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+                # On disk before the rename, so a crash leaves the old or the new file
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @contextmanager
+    def leadership(self) -> Iterator[None]:
+        """
+        Hold the refresh lock. Blocks while another worker is refreshing,
+        so the waiter can reuse that worker's result instead of fetching.
+        The OS releases the lock if the holder dies.
+        """
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _owned(st: os.stat_result) -> bool:
+    """True if the current user owns the file (always on systems without uids)"""
+    return not hasattr(os, 'getuid') or st.st_uid == os.getuid()
@@ -1,135 +1,226 @@
 """Skedda iCal data fetcher"""
 import logging
-import requests
-from icalendar import Calendar
-from datetime import datetime
-from typing import List, Dict, Optional
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Any, List, Dict, Optional, Tuple
 from app.config import Config
+from app.data_fetchers import ical_stream
 from app.utils.text_cleaner import clean_ical_text
 
+if TYPE_CHECKING:
+    import requests
+
 logger = logging.getLogger(__name__)
 
-def fetch_skedda_reservations() -> List[Dict]:
+def parse_ical_response(response: 'requests.Response') -> List[Dict]:
     """
-    Fetch reservations from Skedda iCal feed.
-    Returns list of reservation dictionaries.
-    Handles missing fields gracefully.
+    Stream the iCal body into reservation dictionaries.
+    Events starting outside the configured horizon are skipped unparsed.
     """
-    try:
-        response = requests.get(
-            Config.SKEDDA_ICAL_URL,
-            timeout=Config.FETCH_TIMEOUT,
-            headers={'User-Agent': 'Content-Manager/1.0'}
-        )
-        response.raise_for_status()
-        
-        cal = Calendar.from_ical(response.text)
-        reservations = []
-        
-        for component in cal.walk('VEVENT'):
-            try:
-                reservation = parse_vevent(component)
-                if reservation:
-                    reservations.append(reservation)
-            except Exception as e:
-                logger.warning(f"Error parsing VEVENT: {e}")
-                continue
-        
-        logger.info(f"Successfully fetched {len(reservations)} reservations from Skedda")
-        return reservations
-        
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Failed to fetch Skedda data: {e}")
-        return []
-    except Exception as e:
-        logger.error(f"Unexpected error fetching Skedda data: {e}")
-        return []
+    lines = ical_stream.iter_lines(response.iter_content(chunk_size=64 * 1024))
+    reservations = []
+    skipped = 0
+    
+    for event in ical_stream.iter_vevents(lines, horizon=reservation_horizon()):
+        reservation = parse_raw_vevent(event)
+        if reservation:
+            reservations.append(reservation)
+        else:
+            skipped += 1
+    
+    if skipped:
+        logger.debug(f"Skipped {skipped} VEVENTs without title or location")
+    return reservations
+
+
+def reservation_horizon() -> Optional[Tuple[date, date]]:
+    """Date window (inclusive) of reservations to keep, or None for all"""
+    if Config.SKEDDA_HORIZON_PAST_DAYS < 0 or Config.SKEDDA_HORIZON_FUTURE_DAYS < 0:
+        return None
+    today = date.today()
+    return (
+        today - timedelta(days=Config.SKEDDA_HORIZON_PAST_DAYS),
+        today + timedelta(days=Config.SKEDDA_HORIZON_FUTURE_DAYS)
+    )
 
 
 def parse_vevent(component) -> Optional[Dict]:
     """Parse a VEVENT component from iCal"""
     try:
-        reservation = {
-            'source': 'skedda',
-            'id': None,
-            'title': None,
-            'location': None,
-            'space': None,
-            'start_date': None,
-            'start_time': None,
-            'end_date': None,
-            'end_time': None,
-            'start_datetime': None,
-            'end_datetime': None,
-            'duration': None,
-            'status': None,
-            'reserved_by': None,
-            'description': None
-        }
-        
-        # Extract UID
-        if 'UID' in component:
-            reservation['id'] = str(component.get('UID'))
-        
-        # Extract SUMMARY (title)
-        if 'SUMMARY' in component:
-            reservation['title'] = clean_ical_text(component.get('SUMMARY'))
-        
-        # Extract DESCRIPTION
-        if 'DESCRIPTION' in component:
-            desc = clean_ical_text(component.get('DESCRIPTION'))
-            reservation['description'] = desc
-            # Try to extract space from description (format: "Spaces: Events Bay Lounge")
-            if desc and 'Spaces:' in desc:
-                try:
-                    space = desc.split('Spaces:')[-1].strip()
-                    reservation['space'] = space
-                    reservation['location'] = space  # location and space are synonymous
-                except:
-                    pass
-        
-        # Extract RESOURCES (space/location)
-        if 'RESOURCES' in component:
-            space = clean_ical_text(component.get('RESOURCES'))
-            if space:
-                reservation['space'] = space
-                reservation['location'] = space
-        
-        # Extract DTSTART
-        if 'DTSTART' in component:
-            dt_start = component.get('DTSTART').dt
-            if isinstance(dt_start, datetime):
-                reservation['start_datetime'] = dt_start
-                reservation['start_date'] = dt_start.strftime('%Y-%m-%d')
-                reservation['start_time'] = dt_start.strftime('%I:%M %p')
-            elif hasattr(dt_start, 'date'):
-                reservation['start_date'] = dt_start.date().strftime('%Y-%m-%d')
-        
-        # Extract DTEND
-        if 'DTEND' in component:
-            dt_end = component.get('DTEND').dt
-            if isinstance(dt_end, datetime):
-                reservation['end_datetime'] = dt_end
-                reservation['end_date'] = dt_end.strftime('%Y-%m-%d')
-                reservation['end_time'] = dt_end.strftime('%I:%M %p')
-                # Calculate duration
-                if reservation['start_datetime']:
-                    duration = dt_end - reservation['start_datetime']
-                    reservation['duration'] = int(duration.total_seconds() / 60)  # minutes
-            elif hasattr(dt_end, 'date'):
-                reservation['end_date'] = dt_end.date().strftime('%Y-%m-%d')
-        
-        # Extract STATUS
-        if 'STATUS' in component:
-            reservation['status'] = clean_ical_text(component.get('STATUS')) or 'CONFIRMED'
-        
-        # Only return reservation if it has at least a title or location
-        if reservation['title'] or reservation['location']:
-            return reservation
+        dt_start = component.get('DTSTART').dt if 'DTSTART' in component else None
+        dt_end = component.get('DTEND').dt if 'DTEND' in component else None
+        return build_reservation(
+            uid=str(component.get('UID')) if 'UID' in component else None,
+            summary=component.get('SUMMARY'),
+            description=component.get('DESCRIPTION'),
+            resources=component.get('RESOURCES'),
+            dt_start=dt_start,
+            dt_end=dt_end,
+            status=component.get('STATUS') if 'STATUS' in component else None,
+            rrule=component.get('RRULE').to_ical().decode() if 'RRULE' in component else None,
+            rdates=_component_dates(component.get('RDATE')),
+            exdates=_component_dates(component.get('EXDATE')),
+            recurrence_id=component.get('RECURRENCE-ID').dt if 'RECURRENCE-ID' in component else None
+        )
         
+    except Exception as e:
+        logger.warning(f"Error parsing VEVENT: {e}")
         return None
+
+
+def parse_raw_vevent(event: Dict[str, List[ical_stream.Property]]) -> Optional[Dict]:
+    """Parse the raw properties of a streamed VEVENT (same output as parse_vevent)"""
+    try:
+        uid = ical_stream.first_value(event, 'UID')
+        dt_start = ical_stream.decode_datetime(event['DTSTART'][0]) if 'DTSTART' in event else None
+        dt_end = ical_stream.decode_datetime(event['DTEND'][0]) if 'DTEND' in event else None
+        recurrence_id = event.get('RECURRENCE-ID')
+        return build_reservation(
+            uid=ical_stream.unescape_text(uid) if uid is not None else None,
+            summary=ical_stream.first_value(event, 'SUMMARY'),
+            description=ical_stream.first_value(event, 'DESCRIPTION'),
+            resources=ical_stream.all_values(event, 'RESOURCES'),
+            dt_start=dt_start,
+            dt_end=dt_end,
+            status=ical_stream.first_value(event, 'STATUS'),
+            rrule=ical_stream.first_value(event, 'RRULE'),
+            rdates=ical_stream.decode_datetime_list(event.get('RDATE')),
+            exdates=ical_stream.decode_datetime_list(event.get('EXDATE')),
+            recurrence_id=ical_stream.decode_datetime(recurrence_id[0]) if recurrence_id else None
+        )
         
     except Exception as e:
         logger.warning(f"Error parsing VEVENT: {e}")
         return None
 
+
+def _component_dates(value) -> List:
+    """Dates of an icalendar RDATE/EXDATE value (one vDDDLists or a list of them)"""
+    if value is None:
+        return []
+    lists = value if isinstance(value, list) else [value]
+    return [entry.dt for dates in lists for entry in dates.dts]
+
+
+def build_reservation(
+    uid: Optional[str],
+    summary: Any,
+    description: Any,
+    resources: Any,
+    dt_start: Any,
+    dt_end: Any,
+    status: Any,
+    rrule: Optional[str] = None,
+    rdates: Optional[List] = None,
+    exdates: Optional[List] = None,
+    recurrence_id: Any = None
+) -> Optional[Dict]:
+    """
+    Build a reservation dict from VEVENT property values.
+    Text values may be icalendar objects or raw (escaped) iCal strings;
+    None means the property was absent. Recurring reservations keep their
+    RRULE text and RDATE/EXDATE lists; they are expanded per query window
+    (see app.processors.recurrence), not here.
+    """
+    reservation = {
+        'source': 'skedda',
+        'id': None,
+        'title': None,
+        'location': None,
+        'space': None,
+        'start_date': None,
+        'start_time': None,
+        'end_date': None,
+        'end_time': None,
+        'start_datetime': None,
+        'end_datetime': None,
+        'duration': None,
+        'status': None,
+        'reserved_by': None,
+        'description': None,
+        'rrule': None,
+        'rdates': None,
+        'exdates': None,
+        'recurrence_id': None
+    }
+    
+    # Extract UID
+    if uid is not None:
+        reservation['id'] = uid
+    
+    # Extract SUMMARY (title)
+    if summary is not None:
+        reservation['title'] = clean_ical_text(summary)
+    
+    # Extract DESCRIPTION
+    if description is not None:
+        desc = clean_ical_text(description)
+        reservation['description'] = desc
+        # Try to extract space from description (format: "Spaces: Events Bay Lounge")
+        if desc and 'Spaces:' in desc:
+            try:
+                space = desc.split('Spaces:')[-1].strip()
+                reservation['space'] = space
+                reservation['location'] = space  # location and space are synonymous
+            except:
+                pass
+    
+    # Extract RESOURCES (space/location)
+    if resources is not None:
+        space = clean_ical_text(resources)
+        if space:
+            reservation['space'] = space
+            reservation['location'] = space
+    
+    # Extract DTSTART
+    if dt_start is not None:
+        if isinstance(dt_start, datetime):
+            reservation['start_datetime'] = dt_start
+            reservation['start_date'] = dt_start.strftime('%Y-%m-%d')
+            reservation['start_time'] = dt_start.strftime('%I:%M %p')
+        elif hasattr(dt_start, 'date'):
+            reservation['start_date'] = dt_start.date().strftime('%Y-%m-%d')
+    
+    # Extract DTEND
+    if dt_end is not None:
+        if isinstance(dt_end, datetime):
+            reservation['end_datetime'] = dt_end
+            reservation['end_date'] = dt_end.strftime('%Y-%m-%d')
+            reservation['end_time'] = dt_end.strftime('%I:%M %p')
+            # Calculate duration
+            if reservation['start_datetime']:
+                duration = dt_end - reservation['start_datetime']
+                reservation['duration'] = int(duration.total_seconds() / 60)  # minutes
+        elif hasattr(dt_end, 'date'):
+            reservation['end_date'] = dt_end.date().strftime('%Y-%m-%d')
+    
+    # Extract STATUS
+    if status is not None:
+        reservation['status'] = clean_ical_text(status) or 'CONFIRMED'
+    
+    # Extract RRULE/RDATE/EXDATE, in DTSTART's timezone
+    if rrule:
+        reservation['rrule'] = str(rrule).strip()
+    if rdates:
+        reservation['rdates'] = [_same_zone(value, dt_start) for value in rdates]
+    if exdates:
+        reservation['exdates'] = [_same_zone(value, dt_start) for value in exdates]
+    
+    # Extract RECURRENCE-ID (this VEVENT replaces one occurrence of its UID)
+    if recurrence_id is not None:
+        reservation['recurrence_id'] = _same_zone(recurrence_id, dt_start)
+    
+    # Only return reservation if it has at least a title or location
+    if reservation['title'] or reservation['location']:
+        return reservation
+    
+    return None
+
+
+def _same_zone(value: Any, dt_start: Any) -> Any:
+    """An aware datetime converted to DTSTART's timezone (others unchanged)"""
+    if (
+        isinstance(value, datetime) and value.tzinfo is not None
+        and isinstance(dt_start, datetime) and dt_start.tzinfo is not None
+    ):
+        return value.astimezone(dt_start.tzinfo)
+    return value
@@ -0,0 +1,367 @@
+"""In-memory data snapshot kept fresh by a background refresher"""
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from app.data_fetchers.fetch_engine import FetchResult, SourceStatus
+from app.data_fetchers.shared_snapshot import SharedSnapshotFile
+from app.processors import merger
+from app.processors.availability import AvailabilityIndex
+from app.processors.conflicts import ConflictReport
+from app.processors.incremental import Delta, NormalizedState, renormalize
+from app.processors.index import DateIndex, LocationIndex
+from app.processors.models import Item, Source
+from app.processors.recurrence import RecurrenceExpander
+from app.utils.metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between two refresh attempts
+MIN_REFRESH_SPACING = 5
+
+# Seconds between checks for a newer shared snapshot file
+SHARED_CHECK_INTERVAL = 1.0
+
+
+class Snapshot:
+    """
+    Events and reservations as fetched at one point in time, plus the
+    merged normalized items, the delta against the previous snapshot, the
+    status of each source's latest fetch and the room conflicts report.
+    """
+
+    # Bumped when the pickled layout or normalized values change (e.g. dict
+    # items -> Item); shared files written in another format are ignored
+    FORMAT = 10
+
+    def __init__(
+        self,
+        events: List[Dict],
+        reservations: List[Dict],
+        fetched_at: Optional[float] = None,
+        version: int = 0,
+        items: Optional[List[Item]] = None,
+        delta: Optional[Delta] = None,
+        normalized: Optional[NormalizedState] = None,
+        sources: Optional[Dict[str, SourceStatus]] = None,
+        conflicts: Optional[ConflictReport] = None
+    ):
+        self.events = events
+        self.reservations = reservations
+        self.fetched_at = fetched_at
+        self.version = version
+        self.items = items if items is not None else []
+        self.delta = delta if delta is not None else Delta()
+        self.normalized = normalized if normalized is not None else {}
+        self.sources = sources if sources is not None else {}
+        self.conflicts = conflicts if conflicts is not None else ConflictReport()
+        self.format = self.FORMAT
+        self._indexes: Dict[str, object] = {}
+
+    def __getstate__(self) -> Dict:
+        # Indexes are rebuilt on demand in each worker, not shared on disk
+        state = self.__dict__.copy()
+        state['_indexes'] = {}
+        return state
+
+    @property
+    def date_index(self) -> DateIndex:
+        """Date index over items, built on first use"""
+        return self._index('date', DateIndex)
+
+    @property
+    def location_index(self) -> LocationIndex:
+        """Location/space index over items, built on first use"""
+        return self._index('location', LocationIndex)
+
+    @property
+    def recurring(self) -> RecurrenceExpander:
+        """Recurring masters among items, expanded per query window"""
+        return self._index('recurring', RecurrenceExpander)
+
+    @property
+    def availability(self) -> AvailabilityIndex:
+        """
+        Per-space occupancy over items, plus recurring occurrences from
+        yesterday to RECURRENCE_HORIZON_DAYS ahead; built on first use
+        """
+        return self._index('availability', lambda items: AvailabilityIndex(
+            items, self.recurring.occurrences(date.today() - timedelta(days=1), None)
+        ))
+
+    def _index(self, name: str, factory):
+        index = self._indexes.get(name)
+        if index is None:
+            with timed(f"index.{name}"):
+                index = self._indexes[name] = factory(self.items)
+        return index
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the snapshot was fetched, or None if never fetched"""
+        if self.fetched_at is None:
+            return None
+        return max(time.time() - self.fetched_at, 0.0)
+
+    @property
+    def last_updated(self) -> Optional[datetime]:
+        """Local time the snapshot was fetched"""
+        if self.fetched_at is None:
+            return None
+        return datetime.fromtimestamp(self.fetched_at)
+
+    def feed_records(self, feed: str) -> List[Dict]:
+        """Raw events and reservations that came from one feed"""
+        return [
+            record for record in self.events + self.reservations
+            if (record.get('feed') or record.get('source')) == feed
+        ]
+
+    @property
+    def failed_sources(self) -> List[SourceStatus]:
+        """Sources whose latest fetch failed (their previous data is served)"""
+        return [status for status in self.sources.values() if not status.ok]
+
+    def is_stale(self, ttl: float) -> bool:
+        """True if the snapshot was never fetched or is older than ttl seconds"""
+        age = self.age
+        return age is None or age >= ttl
+
+
+class SnapshotStore:
+    """
+    Holds the latest data snapshot and refreshes it in a background thread.
+    Readers always get the current snapshot immediately; a stale snapshot is
+    served while the refresh runs (stale-while-revalidate).
+
+    With a shared file, workers take turns on a file lock: whoever gets it
+    first fetches and writes the file, the others wait, find a fresh file
+    and skip their fetch. Readers pick up new files via a throttled stat.
+
+    Without sharing, a persist file still keeps the last good snapshot on
+    disk. Either way a restarted worker serves the file's snapshot at once
+    while its first live refresh runs.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], FetchResult],
+        ttl: float,
+        refresh_interval: float,
+        cold_start_wait: float = 0,
+        shared: Optional[SharedSnapshotFile] = None,
+        persist: Optional[SharedSnapshotFile] = None
+    ):
+        self._loader = loader
+        self._ttl = ttl
+        self._refresh_interval = refresh_interval
+        self._cold_start_wait = cold_start_wait
+        self._snapshot = Snapshot([], [])
+        self._refresh_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._last_attempt = 0.0
+        self._shared = shared
+        self._persist = shared or persist
+        self._shared_token = None
+        self._shared_checked = 0.0
+        self._sync_lock = threading.Lock()
+
+    def get(self) -> Snapshot:
+        """Return the latest snapshot without waiting on the network"""
+        self._ensure_started()
+        if self._shared is not None:
+            self._sync_shared()
+        if not self._loaded.is_set() and self._cold_start_wait:
+            # Nothing to serve yet; give the first refresh a bounded head start
+            self._loaded.wait(self._cold_start_wait)
+        snapshot = self._snapshot
+        if snapshot.is_stale(self._ttl):
+            self._wake.set()
+        return snapshot
+
+    @property
+    def current(self) -> Snapshot:
+        """The installed snapshot, without starting the refresher or waiting"""
+        return self._snapshot
+
+    def refresh(self) -> Snapshot:
+        """Fetch new data synchronously; keeps the old snapshot on failure"""
+        with self._refresh_lock:
+            if self._shared is None:
+                snapshot = self._refresh_from_upstream()
+                if snapshot is not None and self._persist is not None:
+                    self._publish(snapshot)
+                return self._snapshot
+            with self._shared.leadership():
+                # Another worker may have refreshed while we waited for the lock
+                self._sync_shared(force=True)
+                age = self._snapshot.age
+                if age is not None and age < min(self._ttl, self._refresh_interval) / 2:
+                    logger.debug(f"Reusing shared snapshot v{self._snapshot.version}")
+                    return self._snapshot
+                snapshot = self._refresh_from_upstream()
+                if snapshot is not None:
+                    self._publish(snapshot)
+                return self._snapshot
+
+    def _refresh_from_upstream(self) -> Optional[Snapshot]:
+        """
+        Run the loader and install its result; None if it failed.
+        A feed that failed keeps its data from the previous snapshot.
+        """
+        started = time.time()
+        self._last_attempt = started
+        try:
+            fetched = self._loader()
+        except Exception as e:
+            logger.error(f"Snapshot refresh failed, serving previous data: {e}")
+            return None
+        previous = self._snapshot
+        sources = {}
+        events, reservations = [], []
+        for name, status in fetched.status.items():
+            if status.ok:
+                records = fetched.data[name]
+            else:
+                last = previous.sources.get(name)
+                status.fetched_at = last.fetched_at if last else None
+                records = previous.feed_records(name)
+            sources[name] = status
+            for record in records:
+                if record.get('source') == Source.SKEDDA.value:
+                    reservations.append(record)
+                else:
+                    events.append(record)
+        if not fetched.any_ok:
+            logger.error("Snapshot refresh failed for every source, serving previous data")
+            if previous.fetched_at is None:
+                return None  # nothing to carry forward yet; retry soon
+            return self._install(Snapshot(
+                previous.events,
+                previous.reservations,
+                fetched_at=started,
+                version=previous.version + 1,
+                items=previous.items,
+                normalized=previous.normalized,
+                sources=sources,
+                conflicts=previous.conflicts
+            ))
+        with timed('normalize'):
+            events_normalized, reservations_normalized, normalized, delta = renormalize(
+                events, reservations, previous.normalized
+            )
+        if not delta and previous.items:
+            items = previous.items  # same normalized items, so the same merge result
+        else:
+            with timed('merge'):
+                items = merger.merge_events_and_reservations(events_normalized, reservations_normalized)
+        snapshot = Snapshot(
+            events,
+            reservations,
+            fetched_at=started,
+            version=previous.version + 1,
+            items=items,
+            delta=delta,
+            normalized=normalized,
+            sources=sources
+        )
+        # Only spaces the delta touched are swept again
+        with timed('conflicts'):
+            snapshot.conflicts = previous.conflicts.update(items, delta, snapshot.recurring)
+        self._install(snapshot)
+        logger.info(
+            f"Snapshot v{snapshot.version} refreshed in {time.time() - started:.2f}s "
+            f"({len(events)} events, {len(reservations)} reservations, {delta!r})"
+        )
+        return snapshot
+
+    def _install(self, snapshot: Snapshot) -> Snapshot:
+        """Make snapshot the one readers get"""
+        self._snapshot = snapshot
+        self._loaded.set()
+        return snapshot
+
+    def _publish(self, snapshot: Snapshot):
+        """Write a freshly fetched snapshot to the shared/persist file"""
+        try:
+            self._persist.save(snapshot)
+            self._shared_token = self._persist.version_token()
+        except Exception as e:
+            logger.error(f"Could not write snapshot file: {e}")
+
+    def _load_persisted(self):
+        """Serve the last good snapshot from disk until the first refresh lands"""
+        snapshot = self._persist.load()
+        if snapshot is None or not self._adopt(snapshot):
+            return
+        logger.info(
+            f"Serving snapshot v{snapshot.version} from {self._persist.path} "
+            f"(fetched {snapshot.age:.0f}s ago) while refreshing"
+        )
+
+    def _adopt(self, snapshot: Snapshot) -> bool:
+        """Install a snapshot read from disk if it is usable and newer"""
+        if getattr(snapshot, 'format', None) != Snapshot.FORMAT:
+            logger.info("Ignoring snapshot file written in an older format")
+            return False
+        if not snapshot.fetched_at or (self._snapshot.fetched_at or 0) >= snapshot.fetched_at:
+            return False
+        self._install(snapshot)
+        return True
+
+    def _sync_shared(self, force: bool = False):
+        """Adopt a newer snapshot written by another worker"""
+        now = time.monotonic()
+        if not force and now - self._shared_checked < SHARED_CHECK_INTERVAL:
+            return
+        if not self._sync_lock.acquire(blocking=force):
+            return  # another thread is already loading it
+        try:
+            self._shared_checked = now
+            token = self._shared.version_token()
+            if token is None or token == self._shared_token:
+                return
+            snapshot = self._shared.load()
+            self._shared_token = token
+            if snapshot is not None and self._adopt(snapshot):
+                logger.debug(f"Loaded shared snapshot v{snapshot.version}")
+        finally:
+            self._sync_lock.release()
+
+    def _ensure_started(self):
+        """Start the refresher thread once per process (gunicorn forks workers)"""
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None:
+            return
+        with self._start_lock:
+            if self._pid == pid and self._thread is not None:
+                return
+            self._pid = pid
+            if self._persist is not None and self._shared is None and not self._loaded.is_set():
+                self._load_persisted()
+            self._thread = threading.Thread(
+                target=self._run,
+                name='snapshot-refresher',
+                daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        """Refresher loop: refresh on schedule, or early when a reader saw stale data"""
+        while True:
+            self.refresh()
+            # Schedule from the snapshot's fetch time so workers sharing a
+            # file wake together and only the lock holder fetches
+            age = self._snapshot.age or 0.0
+            self._wake.wait(max(self._refresh_interval - age, MIN_REFRESH_SPACING))
+            self._wake.clear()
+            # Don't let a burst of stale reads turn into back-to-back upstream calls
+            elapsed = time.time() - self._last_attempt
+            if elapsed < MIN_REFRESH_SPACING:
+                time.sleep(MIN_REFRESH_SPACING - elapsed)
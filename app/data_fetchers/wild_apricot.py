@@ -1,55 +1,33 @@
 """Wild Apricot JSON API data fetcher"""
 import logging
-import requests
 from datetime import datetime
-from typing import List, Dict, Optional
-from app.config import Config
+from typing import TYPE_CHECKING, List, Dict, Optional
+
+if TYPE_CHECKING:
+    import requests
 
 logger = logging.getLogger(__name__)
 
-def fetch_wild_apricot_events() -> List[Dict]:
-    """
-    Fetch events from Wild Apricot JSON API.
-    Returns list of event dictionaries.
-    Handles missing fields gracefully.
-    """
-    try:
-        response = requests.get(
-            Config.WILD_APRICOT_URL,
-            timeout=Config.FETCH_TIMEOUT,
-            headers={'User-Agent': 'Content-Manager/1.0'}
-        )
-        response.raise_for_status()
-        
-        data = response.json()
-        events = []
-        
-        # The API returns {"generated_at": "...", "events": [...]}
-        if 'events' not in data:
-            logger.warning("No 'events' key found in API response")
-            return []
-        
-        for event_data in data['events']:
-            try:
-                event = parse_event_data(event_data)
-                if event:
-                    events.append(event)
-            except Exception as e:
-                logger.warning(f"Error parsing event: {e}")
-                continue
-        
-        logger.info(f"Successfully fetched {len(events)} events from Wild Apricot API")
-        return events
-        
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Failed to fetch Wild Apricot data: {e}")
-        return []
-    except ValueError as e:
-        logger.error(f"Failed to parse JSON response: {e}")
-        return []
-    except Exception as e:
-        logger.error(f"Unexpected error fetching Wild Apricot data: {e}")
+def parse_events_response(response: 'requests.Response') -> List[Dict]:
+    """Parse the JSON API response body into event dictionaries"""
+    data = response.json()
+    events = []
+    
+    # The API returns {"generated_at": "...", "events": [...]}
+    if 'events' not in data:
+        logger.warning("No 'events' key found in API response")
         return []
+    
+    for event_data in data['events']:
+        try:
+            event = parse_event_data(event_data)
+            if event:
+                events.append(event)
+        except Exception as e:
+            logger.warning(f"Error parsing event: {e}")
+            continue
+    
+    return events
 
 
 def parse_event_data(event_data: Dict) -> Optional[Dict]:
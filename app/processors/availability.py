@@ -0,0 +1,186 @@
+"""
+Per-space occupancy index for free/busy queries.
+
+Each space's bookings are kept as intervals sorted by start, with a
+running maximum of their ends. Whether a space is busy at a moment (or
+during a range) is one bisect plus one lookup in that maximum; listing the
+bookings involved walks back only over intervals that can still overlap.
+"""
+import logging
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.config import Config
+from app.processors.models import Item
+from app.utils import date_parsing
+
+logger = logging.getLogger(__name__)
+
+Interval = Tuple[datetime, datetime]
+
+
+def item_interval(item: Item, default_minutes: Optional[float] = None) -> Optional[Interval]:
+    """
+    (start, end) an item occupies its space, as naive local datetimes
+    (aware values are converted, not just stripped). Items without an
+    end (Wild Apricot events, unless a reservation was folded into them)
+    get their duration, else default_minutes (DEFAULT_EVENT_MINUTES).
+    None for undated/untimed or cancelled items.
+    """
+    if not isinstance(item.start_datetime, datetime) or str(item.status or '').upper() == 'CANCELLED':
+        return None
+    start = item.sort_key  # the start, already naive local time
+    end = item.end_datetime
+    if isinstance(end, datetime):
+        end = date_parsing.to_local(end)
+    elif item.duration:
+        end = start + timedelta(minutes=item.duration)
+    else:
+        if default_minutes is None:
+            default_minutes = Config.DEFAULT_EVENT_MINUTES
+        end = start + timedelta(minutes=default_minutes)
+    if end <= start:
+        return None
+    return start, end
+
+
+class SpaceIntervals:
+    """One space's bookings sorted by start, with the running max of their ends"""
+
+    __slots__ = ('name', 'starts', 'ends', 'items', 'max_ends')
+
+    def __init__(self, name: str, bookings: List[Tuple[datetime, datetime, Item]]):
+        bookings.sort(key=itemgetter(0, 1))
+        self.name = name
+        self.starts = [booking[0] for booking in bookings]
+        self.ends = [booking[1] for booking in bookings]
+        self.items = [booking[2] for booking in bookings]
+        self.max_ends = []
+        latest = None
+        for end in self.ends:
+            latest = end if latest is None or end > latest else latest
+            self.max_ends.append(latest)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def overlapping(self, start: datetime, end: datetime) -> List[Item]:
+        """Bookings overlapping [start, end) (a moment when start == end), by start"""
+        # Only bookings starting before end (at end, for a moment) can overlap
+        i = bisect_right(self.starts, start) if end <= start else bisect_left(self.starts, end)
+        found = []
+        # max_ends[j] <= start means nothing at or before j is still running
+        while i > 0 and self.max_ends[i - 1] > start:
+            i -= 1
+            if self.ends[i] > start:
+                found.append(self.items[i])
+        found.reverse()
+        return found
+
+    def is_busy(self, start: datetime, end: datetime) -> bool:
+        """True if any booking overlaps [start, end) (a moment when start == end)"""
+        i = bisect_right(self.starts, start) if end <= start else bisect_left(self.starts, end)
+        return i > 0 and self.max_ends[i - 1] > start
+
+    def free_from(self, moment: datetime) -> datetime:
+        """First moment at or after moment when the space is free"""
+        while True:
+            i = bisect_right(self.starts, moment)
+            if i == 0 or self.max_ends[i - 1] <= moment:
+                return moment
+            moment = self.max_ends[i - 1]
+
+    def next_start(self, moment: datetime) -> Optional[datetime]:
+        """Start of the first booking starting after moment"""
+        i = bisect_right(self.starts, moment)
+        return self.starts[i] if i < len(self.starts) else None
+
+
+class SpaceAvailability:
+    """Free/busy answer for one space"""
+
+    __slots__ = ('name', 'bookings', 'free_from', 'next_booking')
+
+    def __init__(
+        self,
+        name: str,
+        bookings: List[Item],
+        free_from: Optional[datetime] = None,
+        next_booking: Optional[datetime] = None
+    ):
+        self.name = name
+        self.bookings = bookings
+        self.free_from = free_from
+        self.next_booking = next_booking
+
+    @property
+    def busy(self) -> bool:
+        return bool(self.bookings)
+
+
+class AvailabilityIndex:
+    """
+    SpaceIntervals per normalized (lower-cased) space name, built once per
+    snapshot from its items plus any expanded recurring occurrences.
+    Queries answer for every space at once in O(spaces * log n).
+    """
+
+    def __init__(
+        self,
+        items: Iterable[Item],
+        occurrences: Iterable[Item] = (),
+        default_minutes: Optional[float] = None
+    ):
+        if default_minutes is None:
+            default_minutes = Config.DEFAULT_EVENT_MINUTES
+        bookings = defaultdict(list)
+        names: Dict[str, str] = {}
+        for source in (items, occurrences):
+            for item in source:
+                if item.recurrence or not item.location_key:
+                    continue
+                interval = item_interval(item, default_minutes)
+                if interval is None:
+                    continue
+                bookings[item.location_key].append((interval[0], interval[1], item))
+                names.setdefault(item.location_key, item.location or item.space)
+        self._spaces = {
+            key: SpaceIntervals(names[key], bookings[key])
+            for key in sorted(bookings, key=lambda key: names[key].lower())
+        }
+        logger.debug(f"Built availability index: {len(self._spaces)} spaces")
+
+    def __len__(self) -> int:
+        return len(self._spaces)
+
+    @property
+    def spaces(self) -> List[str]:
+        """Display names of the spaces, sorted"""
+        return [space.name for space in self._spaces.values()]
+
+    def space(self, name: str) -> Optional[SpaceIntervals]:
+        """Intervals of one space by name (any case)"""
+        return self._spaces.get(name.lower().strip())
+
+    def at(self, moment: datetime, location: Optional[str] = None) -> List[SpaceAvailability]:
+        """Who is in each space at moment; busy spaces say when they are free again"""
+        return self.between(moment, moment, location)
+
+    def between(self, start: datetime, end: datetime, location: Optional[str] = None) -> List[SpaceAvailability]:
+        """
+        Bookings overlapping [start, end) in each space (a moment when
+        start == end), optionally only spaces whose name contains location
+        """
+        result = []
+        for key, space in self._spaces.items():
+            if location and location not in key:
+                continue
+            result.append(SpaceAvailability(
+                space.name,
+                space.overlapping(start, end),
+                free_from=space.free_from(start),
+                next_booking=space.next_start(start)
+            ))
+        return result
@@ -0,0 +1,188 @@
+"""
+Room conflicts: a Wild Apricot event and a Skedda reservation booked into
+the same space at overlapping times.
+
+Each space's bookings are sorted by start and swept once. The bookings
+still running are kept in one heap per source, keyed by end, so each new
+booking meets only the other source's bookings it overlaps: O(n log n)
+plus the conflicts found, instead of comparing every pair. A refresh only
+re-sweeps the spaces its delta touched.
+"""
+import heapq
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time
+from operator import itemgetter
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple
+from app.config import Config
+from app.processors.availability import item_interval
+from app.processors.models import Item, Source
+
+if TYPE_CHECKING:
+    from app.processors.incremental import Delta
+    from app.processors.recurrence import RecurrenceExpander
+
+logger = logging.getLogger(__name__)
+
+Booking = Tuple[datetime, datetime, Item]
+
+
+class Conflict:
+    """An event and a reservation overlapping in one space from start to end"""
+
+    __slots__ = ('space', 'event', 'reservation', 'start', 'end')
+
+    def __init__(self, space: str, event: Item, reservation: Item, start: datetime, end: datetime):
+        self.space = space
+        self.event = event
+        self.reservation = reservation
+        self.start = start
+        self.end = end
+
+    def __repr__(self) -> str:
+        return f"Conflict({self.space!r}, {self.event.id!r}, {self.reservation.id!r}, {self.start:%Y-%m-%d %H:%M})"
+
+    def to_dict(self) -> Dict:
+        """JSON-ready fields (datetimes are left to the encoder)"""
+        return {
+            'space': self.space,
+            'start': self.start,
+            'end': self.end,
+            'event': _booking_dict(self.event),
+            'reservation': _booking_dict(self.reservation),
+        }
+
+
+def _booking_dict(item: Item) -> Dict:
+    return {
+        'feed': item.feed,
+        'id': item.id,
+        'title': item.title,
+        'start_datetime': item.start_datetime,
+        'end_datetime': item.end_datetime,
+    }
+
+
+def sweep(space: str, bookings: List[Booking]) -> List[Conflict]:
+    """Conflicts among one space's bookings, ordered by start"""
+    bookings.sort(key=itemgetter(0, 1))
+    running: Dict[bool, List[Tuple[datetime, int, Item]]] = {True: [], False: []}
+    conflicts = []
+    for position, (start, end, item) in enumerate(bookings):
+        is_event = item.source is Source.WILD_APRICOT
+        others = running[not is_event]
+        # Bookings of the other source that ended by now can't overlap
+        # this or any later booking
+        while others and others[0][0] <= start:
+            heapq.heappop(others)
+        for other_end, _, other in others:
+            event, reservation = (item, other) if is_event else (other, item)
+            conflicts.append(Conflict(space, event, reservation, start, min(end, other_end)))
+        heapq.heappush(running[is_event], (end, position, item))
+    conflicts.sort(key=lambda conflict: (conflict.start, conflict.end))
+    return conflicts
+
+
+class ConflictReport:
+    """
+    Conflicts per space (lower-cased name) for bookings ending on or after
+    day, plus which spaces each (feed, UID) was booked into so the next
+    refresh knows what its delta touched.
+    """
+
+    def __init__(
+        self,
+        by_space: Optional[Dict[str, List[Conflict]]] = None,
+        spaces_of: Optional[Dict[Tuple[str, str], Set[str]]] = None,
+        day: Optional[date] = None
+    ):
+        self.by_space = by_space if by_space is not None else {}
+        self.spaces_of = spaces_of if spaces_of is not None else {}
+        self.day = day
+
+    def __len__(self) -> int:
+        return sum(len(conflicts) for conflicts in self.by_space.values())
+
+    @property
+    def conflicts(self) -> List[Conflict]:
+        """All conflicts, by start then space"""
+        found = [conflict for conflicts in self.by_space.values() for conflict in conflicts]
+        found.sort(key=lambda conflict: (conflict.start, conflict.space.lower()))
+        return found
+
+    def update(
+        self,
+        items: List[Item],
+        delta: 'Delta',
+        recurring: Optional['RecurrenceExpander'] = None,
+        day: Optional[date] = None
+    ) -> 'ConflictReport':
+        """
+        The report for a refreshed snapshot. Spaces the delta didn't touch
+        keep their conflicts; a new day (which moves the window and the
+        recurring occurrences in it) rebuilds every space.
+        """
+        day = day or date.today()
+        if self.day == day and not delta:
+            return self
+        touched: Optional[Set[str]] = None
+        if self.day == day:
+            touched = set()
+            for item in delta.added + delta.changed + delta.removed:
+                if item.location_key:
+                    touched.add(item.location_key)
+                touched |= self.spaces_of.get((item.feed, item.id), set())
+        report = build_report(items, recurring, day, touched)
+        if touched is not None:
+            for space, conflicts in self.by_space.items():
+                if space not in touched:
+                    report.by_space[space] = conflicts
+            logger.info(f"Re-swept {len(touched)} spaces for conflicts: {len(report)} conflicts")
+        else:
+            logger.info(f"Swept all spaces for conflicts: {len(report)} conflicts")
+        return report
+
+
+def build_report(
+    items: Iterable[Item],
+    recurring: Optional['RecurrenceExpander'] = None,
+    day: Optional[date] = None,
+    spaces: Optional[Set[str]] = None,
+    default_minutes: Optional[float] = None
+) -> ConflictReport:
+    """
+    Sweep the given spaces (all when None) for conflicts between bookings
+    that end on or after day. Recurring reservations take part with their
+    occurrences from day to RECURRENCE_HORIZON_DAYS ahead.
+    """
+    day = day or date.today()
+    if default_minutes is None:
+        default_minutes = Config.DEFAULT_EVENT_MINUTES
+    since = datetime.combine(day, time.min)
+    occurrences = recurring.occurrences(day, None) if recurring else ()
+
+    bookings: Dict[str, List[Booking]] = defaultdict(list)
+    names: Dict[str, str] = {}
+    spaces_of: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+    for source in (items, occurrences):
+        for item in source:
+            key = item.location_key
+            if not key:
+                continue
+            spaces_of[(item.feed, item.id)].add(key)
+            if item.recurrence or (spaces is not None and key not in spaces):
+                continue
+            if item.source is not Source.WILD_APRICOT and item.source is not Source.SKEDDA:
+                continue
+            interval = item_interval(item, default_minutes)
+            if interval is None or interval[1] <= since:
+                continue
+            bookings[key].append((interval[0], interval[1], item))
+            names.setdefault(key, item.location or item.space)
+
+    by_space = {}
+    for key, space_bookings in bookings.items():
+        conflicts = sweep(names[key], space_bookings)
+        if conflicts:
+            by_space[key] = conflicts
+    return ConflictReport(by_space, dict(spaces_of), day)
@@ -1,24 +1,57 @@
 """Data filtering logic"""
 import logging
-from datetime import datetime, timedelta, date
-from typing import List, Dict, Optional
-from dateutil.relativedelta import relativedelta
+from datetime import timedelta, date
+from typing import List, Optional, Tuple
+from app.processors.models import Item, derive_date
 
 logger = logging.getLogger(__name__)
 
 def filter_by_date_range(
-    items: List[Dict],
+    items: List[Item],
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     date_range: Optional[str] = None,
     specific_date: Optional[date] = None
-) -> List[Dict]:
+) -> List[Item]:
     """Filter items by date range"""
     if not items:
         return []
     
-    # Determine date range
-    today = date.today()
+    start_date, end_date = resolve_date_range(start_date, end_date, date_range, specific_date)
+    
+    if not start_date and not end_date:
+        return items  # No date filter
+    
+    filtered = []
+    for item in items:
+        item_date = get_item_date(item)
+        if item_date:
+            if start_date and end_date:
+                if start_date <= item_date <= end_date:
+                    filtered.append(item)
+            elif start_date:
+                if item_date >= start_date:
+                    filtered.append(item)
+            elif end_date:
+                if item_date <= end_date:
+                    filtered.append(item)
+        else:
+            # Include items without dates if no filter specified
+            if not start_date and not end_date:
+                filtered.append(item)
+    
+    return filtered
+
+
+def resolve_date_range(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    date_range: Optional[str] = None,
+    specific_date: Optional[date] = None,
+    today: Optional[date] = None
+) -> Tuple[Optional[date], Optional[date]]:
+    """Turn date/range query values into an inclusive (start, end) window"""
+    today = today or date.today()
     
     if specific_date:
         start_date = specific_date
@@ -41,63 +74,50 @@ def filter_by_date_range(
             end_date = start_date + timedelta(days=6)
         elif date_range == 'this-month':
             start_date = today.replace(day=1)
-            end_date = (start_date + relativedelta(months=1)) - timedelta(days=1)
+            end_date = first_of_next_month(start_date) - timedelta(days=1)
         elif date_range == 'next-month':
-            start_date = (today.replace(day=1) + relativedelta(months=1))
-            end_date = (start_date + relativedelta(months=1)) - timedelta(days=1)
+            start_date = first_of_next_month(today)
+            end_date = first_of_next_month(start_date) - timedelta(days=1)
         elif date_range == 'next-10-days':
             start_date = today
             end_date = today + timedelta(days=9)  # 9 days from today = 10 days total including today
     
-    if not start_date and not end_date:
-        return items  # No date filter
-    
-    filtered = []
-    for item in items:
-        item_date = get_item_date(item)
-        if item_date:
-            if start_date and end_date:
-                if start_date <= item_date <= end_date:
-                    filtered.append(item)
-            elif start_date:
-                if item_date >= start_date:
-                    filtered.append(item)
-            elif end_date:
-                if item_date <= end_date:
-                    filtered.append(item)
-        else:
-            # Include items without dates if no filter specified
-            if not start_date and not end_date:
-                filtered.append(item)
-    
-    return filtered
+    return start_date, end_date
+
 
+def first_of_next_month(day: date) -> date:
+    """1st of the month after day's month"""
+    if day.month == 12:
+        return date(day.year + 1, 1, 1)
+    return date(day.year, day.month + 1, 1)
 
-def filter_by_location(items: List[Dict], location: Optional[str]) -> List[Dict]:
+
+def filter_by_location(items: List[Item], location: Optional[str]) -> List[Item]:
     """Filter items by location/space (case-insensitive partial match)"""
     if not location or not items:
         return items
     
     location_lower = location.lower().strip()
-    filtered = []
-    
-    for item in items:
-        item_location = (item.get('location') or item.get('space') or '').lower()
-        if location_lower in item_location:
-            filtered.append(item)
-    
-    return filtered
+    return [item for item in items if matches_location(item, location_lower)]
+
 
+def matches_location(item: Item, location_lower: str) -> bool:
+    """True if the item's location/space contains the lower-cased query"""
+    if isinstance(item, Item):
+        return location_lower in item.location_key
+    item_location = (item.get('location') or item.get('space') or '').lower()
+    return location_lower in item_location
 
-def filter_by_source(items: List[Dict], source: str) -> List[Dict]:
-    """Filter items by data source"""
+
+def filter_by_source(items: List[Item], source: str) -> List[Item]:
+    """Filter items by data source or feed name"""
     if source == 'all' or not source:
         return items
     
-    return [item for item in items if item.get('source') == source]
+    return [item for item in items if item.get('source') == source or item.get('feed') == source]
 
 
-def filter_past_events(items: List[Dict], filter_past: bool = True) -> List[Dict]:
+def filter_past_events(items: List[Item], filter_past: bool = True) -> List[Item]:
     """Filter out past events/reservations"""
     if not filter_past or not items:
         return items
@@ -118,30 +138,8 @@ def filter_past_events(items: List[Dict], filter_past: bool = True) -> List[Dict
     return filtered
 
 
-def get_item_date(item: Dict) -> Optional[date]:
+def get_item_date(item: Item) -> Optional[date]:
     """Extract date from item (start_date or start_datetime)"""
-    # Try start_datetime first
-    if item.get('start_datetime'):
-        dt = item['start_datetime']
-        if isinstance(dt, datetime):
-            return dt.date()
-        elif isinstance(dt, date):
-            return dt
-    
-    # Try start_date string
-    if item.get('start_date'):
-        date_str = item['start_date']
-        try:
-            if isinstance(date_str, date):
-                return date_str
-            elif '/' in date_str:
-                # MM/DD/YYYY format
-                return datetime.strptime(date_str, '%m/%d/%Y').date()
-            else:
-                # YYYY-MM-DD format
-                return datetime.strptime(date_str, '%Y-%m-%d').date()
-        except:
-            pass
-    
-    return None
-
+    if isinstance(item, Item):
+        return item.day
+    return derive_date(item.get('start_datetime'), item.get('start_date'))
@@ -0,0 +1,108 @@
+"""Incremental normalization keyed by feed/UID, reusing items whose raw record is unchanged"""
+import hashlib
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+from app.processors import normalizer
+from app.processors.models import Item
+
+logger = logging.getLogger(__name__)
+
+# (feed, uid, occurrence) -> (raw record, normalized item)
+NormalizedState = Dict[Tuple[str, str, int], Tuple[Dict, Item]]
+
+
+class Delta:
+    """Items added, changed and removed between two refreshes"""
+
+    def __init__(
+        self,
+        added: Optional[List[Item]] = None,
+        changed: Optional[List[Item]] = None,
+        removed: Optional[List[Item]] = None
+    ):
+        self.added = added or []
+        self.changed = changed or []
+        self.removed = removed or []
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def __repr__(self) -> str:
+        return f"Delta(added={len(self.added)}, changed={len(self.changed)}, removed={len(self.removed)})"
+
+
+def record_digest(record: Dict) -> str:
+    """
+    Stable hash of a raw record (same value in every worker process). Only
+    keys records without a UID; it is too slow to run on every record.
+    """
+    payload = repr(sorted(record.items(), key=lambda kv: kv[0])).encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def renormalize(
+    events_raw: List[Dict],
+    reservations_raw: List[Dict],
+    previous: Optional[NormalizedState] = None
+) -> Tuple[List[Item], List[Item], NormalizedState, Delta]:
+    """
+    Normalize only records that are new or differ (==) from the raw record
+    kept in the previous state; unchanged records reuse their normalized
+    item.
+    Returns normalized events, normalized reservations, the new state and
+    the delta against the previous state.
+    """
+    previous = previous or {}
+    state: NormalizedState = {}
+    delta = Delta()
+
+    events = _renormalize_source(
+        events_raw, 'wild-apricot', normalizer.normalize_event, previous, state, delta
+    )
+    reservations = _renormalize_source(
+        reservations_raw, 'skedda', normalizer.normalize_reservation, previous, state, delta
+    )
+
+    for key, (_, item) in previous.items():
+        if key not in state:
+            delta.removed.append(item)
+
+    reused = len(state) - len(delta.added) - len(delta.changed)
+    logger.info(f"Renormalized {len(state) - reused} of {len(state)} items: {delta!r}")
+    return events, reservations, state, delta
+
+
+def _renormalize_source(
+    records: List[Dict],
+    default_source: str,
+    normalize: Callable[[Dict], Item],
+    previous: NormalizedState,
+    state: NormalizedState,
+    delta: Delta
+) -> List[Item]:
+    """Normalize one source's records into state, recording the delta"""
+    items = []
+    for record in records:
+        # UIDs are only unique within one feed
+        feed = record.get('feed') or record.get('source') or default_source
+        uid = str(record.get('id') or record_digest(record))
+        # Recurring overrides can repeat a UID; number the repeats
+        occurrence = 0
+        while (feed, uid, occurrence) in state:
+            occurrence += 1
+        key = (feed, uid, occurrence)
+
+        entry = previous.get(key)
+        # Comparing the records themselves is much cheaper than hashing
+        # them (a repr of every aware datetime) on each refresh
+        if entry is not None and entry[0] == record:
+            item = entry[1]
+        else:
+            item = normalize(record)
+            if entry is None:
+                delta.added.append(item)
+            else:
+                delta.changed.append(item)
+        state[key] = (record, item)
+        items.append(item)
+    return items
@@ -0,0 +1,123 @@
+"""Pre-built lookup indexes over a snapshot's normalized items"""
+import logging
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date
+from typing import Callable, Dict, FrozenSet, List, Optional, Set
+from app.processors.models import Item
+from app.processors.organizer import sort_by_time
+
+logger = logging.getLogger(__name__)
+
+# Distinct location queries remembered per LocationIndex
+MAX_MEMOIZED_QUERIES = 256
+
+
+class DateIndex:
+    """
+    Items grouped per day, days sorted by date ordinal, each day already
+    sorted by start time. A date window is two bisects plus the k items
+    inside it, and the result comes out grouped the way organize_by_date
+    would group it. Recurring masters are left out: their occurrences are
+    expanded per window (see RecurrenceExpander).
+    """
+
+    def __init__(self, items: List[Item]):
+        groups = defaultdict(list)
+        undated = []
+        for item in items:
+            if item.recurrence:
+                continue
+            if item.date_ordinal is not None:
+                groups[item.date_ordinal].append(item)
+            else:
+                undated.append(item)
+
+        self._ordinals = sorted(groups)
+        self._days = [date.fromordinal(ordinal) for ordinal in self._ordinals]
+        self._groups = [sort_by_time(groups[ordinal]) for ordinal in self._ordinals]
+        self._undated = sort_by_time(undated)
+        logger.debug(f"Built date index: {len(self._days)} days, {len(undated)} undated items")
+
+    def __len__(self) -> int:
+        return sum(len(group) for group in self._groups) + len(self._undated)
+
+    def lookup(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        include_undated: bool = False,
+        keep: Optional[Callable[[Item], bool]] = None
+    ) -> Dict[Optional[date], List[Item]]:
+        """
+        Items dated within [start, end] (either bound optional), grouped by
+        date and sorted by time. Undated items go under the None key when
+        include_undated is set. keep, if given, filters individual items.
+        """
+        lo = bisect_left(self._ordinals, start.toordinal()) if start else 0
+        hi = bisect_right(self._ordinals, end.toordinal()) if end else len(self._ordinals)
+
+        result = {}
+        for i in range(lo, hi):
+            group = self._groups[i] if keep is None else [item for item in self._groups[i] if keep(item)]
+            if group:
+                result[self._days[i]] = group
+        if include_undated:
+            group = self._undated if keep is None else [item for item in self._undated if keep(item)]
+            if group:
+                result[None] = group
+        return result
+
+
+class LocationIndex:
+    """
+    Items grouped by lower-cased location/space name, plus a trigram index
+    over the (small) set of distinct names. A location query resolves to
+    the set of matching names once and is memoized per query string.
+    """
+
+    def __init__(self, items: List[Item]):
+        by_name = defaultdict(list)
+        for item in items:
+            if not item.recurrence:
+                by_name[item.location_key].append(item)
+        self._by_name = dict(by_name)
+        self._trigrams = defaultdict(set)
+        for name in self._by_name:
+            for gram in _trigrams(name):
+                self._trigrams[gram].add(name)
+        self._memo: Dict[str, FrozenSet[int]] = {}
+
+    @property
+    def names(self) -> List[str]:
+        """Distinct lower-cased location names"""
+        return sorted(name for name in self._by_name if name)
+
+    def matching_names(self, query: str) -> List[str]:
+        """Names containing the lower-cased query (same rule as filter_by_location)"""
+        candidates = self._by_name.keys()
+        grams = _trigrams(query)
+        if grams:
+            sets = sorted((self._trigrams.get(gram, set()) for gram in grams), key=len)
+            candidates = set.intersection(*sets)
+        return [name for name in candidates if query in name]
+
+    def candidates(self, location: str) -> FrozenSet[int]:
+        """ids of items whose location/space matches the query"""
+        query = location.lower().strip()
+        found = self._memo.get(query)
+        if found is None:
+            found = frozenset(
+                id(item)
+                for name in self.matching_names(query)
+                for item in self._by_name[name]
+            )
+            if len(self._memo) >= MAX_MEMOIZED_QUERIES:
+                self._memo.clear()
+            self._memo[query] = found
+        return found
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Character trigrams of text (empty for strings shorter than 3)"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
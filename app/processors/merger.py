@@ -1,23 +1,190 @@
 """Data merging logic"""
+import heapq
 import logging
-from typing import List, Dict
+import re
+from collections import defaultdict
+from datetime import date, datetime, time
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from app.config import Config
+from app.processors.models import Item, Source
 
 logger = logging.getLogger(__name__)
 
+# Sorts undated items after every date ordinal
+_UNDATED = float('inf')
+
+_EPOCH = datetime(1970, 1, 1)
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+
 def merge_events_and_reservations(
-    events: List[Dict],
-    reservations: List[Dict]
-) -> List[Dict]:
-    """Merge events and reservations into a single list"""
-    merged = []
-    
-    # Add all events
-    merged.extend(events)
-    
-    # Add all reservations
-    merged.extend(reservations)
-    
-    logger.info(f"Merged {len(events)} events and {len(reservations)} reservations into {len(merged)} items")
-    
+    events: List[Item],
+    reservations: List[Item]
+) -> List[Item]:
+    """
+    Merge events and reservations into a single list ordered by date and
+    start time (undated items last). With DEDUP_ENABLED, a reservation
+    that books the room for an event is folded into that event.
+    """
+    merged = list(merge_sorted([events, reservations]))
+    folded = 0
+    if Config.DEDUP_ENABLED:
+        before = len(merged)
+        merged = dedupe(merged, Config.DEDUP_WINDOW_MINUTES * 60, Config.DEDUP_TITLE_SIMILARITY)
+        folded = before - len(merged)
+
+    logger.info(
+        f"Merged {len(events)} events and {len(reservations)} reservations into {len(merged)} items"
+        f" ({folded} duplicates folded)"
+    )
+
     return merged
 
+
+def merge_sorted(streams: Iterable[List[Item]]) -> Iterator[Item]:
+    """
+    k-way merge of per-source item lists by merge_key. Each list is sorted
+    first (feeds mostly arrive in order, so that is close to linear); items
+    with equal keys keep their stream order, then their order in the stream.
+    Keys are computed once per item and compared as plain tuples.
+    """
+    runs = []
+    for rank, stream in enumerate(streams):
+        # (rank, position) is unique, so items themselves are never compared
+        run = [(merge_key(item), rank, position, item) for position, item in enumerate(stream)]
+        run.sort()
+        runs.append(run)
+    for entry in heapq.merge(*runs):
+        yield entry[3]
+
+
+def merge_key(item: Item) -> Tuple:
+    """
+    Date ordinal, then time of day in microseconds: the order sort_by_time
+    gives within a day, extended to a total order over all items (items
+    without a start time sort after the timed ones, by title)
+    """
+    key = item.sort_key
+    ordinal = item.date_ordinal
+    ordinal = ordinal if ordinal is not None else _UNDATED
+    if isinstance(key, (datetime, time)):
+        return (ordinal, 0, _day_microseconds(key))
+    if isinstance(key, date):
+        return (ordinal, 0, 0)
+    return (ordinal, 1, key)
+
+
+def _day_microseconds(value) -> int:
+    return ((value.hour * 60 + value.minute) * 60 + value.second) * 1_000_000 + value.microsecond
+
+
+def dedupe(items: List[Item], window: float, min_similarity: float) -> List[Item]:
+    """
+    Fold Skedda reservations into the Wild Apricot event they duplicate:
+    same space, starts at most window seconds apart, and titles at least
+    min_similarity alike. Reservations are hashed by (space, start bucket)
+    so each event is only compared with reservations in its own and the
+    neighbouring buckets. Order is kept; the event's slot holds the merged
+    item. Recurring reservations are never folded (their start is only the
+    first occurrence).
+    """
+    if window <= 0:
+        return items
+    skedda, wild_apricot = Source.SKEDDA, Source.WILD_APRICOT
+    events = []
+    buckets: Dict[Tuple[str, int], List[Tuple[float, Item]]] = defaultdict(list)
+    for item in items:
+        source = item.source
+        if not item.location_key or item.recurrence or (source is not skedda and source is not wild_apricot):
+            continue
+        start = _start_seconds(item)
+        if start is None:
+            continue
+        if source is skedda:
+            buckets[(item.location_key, int(start // window))].append((start, item))
+        else:
+            events.append((start, item))
+    if not buckets or not events:
+        return items
+
+    folded = set()
+    replacements = {}
+    for start, item in events:
+        bucket = int(start // window)
+        best: Optional[Tuple[float, Item]] = None
+        for neighbour in (bucket - 1, bucket, bucket + 1):
+            for reservation_start, reservation in buckets.get((item.location_key, neighbour), ()):
+                if id(reservation) in folded or abs(reservation_start - start) > window:
+                    continue
+                score = title_similarity(item.title, reservation.title, min_similarity)
+                if score >= min_similarity and (best is None or score > best[0]):
+                    best = (score, reservation)
+        if best is not None:
+            folded.add(id(best[1]))
+            replacements[id(item)] = merge_items(item, best[1])
+
+    if not folded:
+        return items
+    return [replacements.get(id(item), item) for item in items if id(item) not in folded]
+
+
+def title_similarity(a: Optional[str], b: Optional[str], enough: float = 1.0) -> float:
+    """
+    0..1 likeness of two titles: the larger of word overlap (shared words
+    over the shorter title's words) and difflib's ratio of the word
+    sequences. Only whether a score reaches enough is exact: the ratio is
+    skipped when the overlap already does, or when it can't.
+    """
+    words_a, text_a = _title_words(a or '')
+    words_b, text_b = _title_words(b or '')
+    if not words_a or not words_b:
+        return 0.0
+    overlap = len(words_a & words_b) / min(len(words_a), len(words_b))
+    if overlap >= enough:
+        return overlap
+    # The length bound (difflib's real_quick_ratio) rules most pairs out
+    # before a matcher is built
+    if 2.0 * min(len(text_a), len(text_b)) / (len(text_a) + len(text_b)) < enough:
+        return overlap
+    return max(overlap, _ratio(text_a, text_b, enough))
+
+
+@lru_cache(maxsize=4096)
+def _ratio(text_a: str, text_b: str, enough: float) -> float:
+    """difflib ratio, or 0 when its quick upper bound is already below enough"""
+    matcher = SequenceMatcher(None, text_a, text_b)
+    if matcher.quick_ratio() < enough:
+        return 0.0
+    return matcher.ratio()
+
+
+@lru_cache(maxsize=4096)
+def _title_words(title: str) -> Tuple[frozenset, str]:
+    """Distinct lower-case words of a title, and the words joined by spaces"""
+    words = _WORD.findall(title.lower())
+    return frozenset(words), ' '.join(words)
+
+
+def merge_items(event: Item, reservation: Item) -> Item:
+    """
+    The event with the reservation's fields filled in where the event has
+    none (end time, duration, space, status). merged_from lists the
+    (feed, id) of the folded reservation.
+    """
+    fields = event.to_dict()
+    for name in ('location', 'space', 'end_datetime', 'end_date', 'end_time', 'duration', 'status', 'description'):
+        if fields[name] in (None, ''):
+            fields[name] = reservation.get(name)
+    fields['merged_from'] = tuple(event.merged_from or ()) + ((reservation.feed, reservation.id),)
+    return Item(**fields)
+
+
+def _start_seconds(item: Item) -> Optional[float]:
+    """Start as seconds since the epoch in local wall time, if it has a start time"""
+    key = item.sort_key
+    if isinstance(key, datetime):
+        return (key - _EPOCH).total_seconds()
+    return None
@@ -0,0 +1,129 @@
+"""Normalized item model shared by the processors and templates"""
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Optional, Union
+from app.utils import date_parsing
+
+
+class Source(str, Enum):
+    """Where an item came from (compares equal to its string value)"""
+    WILD_APRICOT = 'wild-apricot'
+    SKEDDA = 'skedda'
+
+    def __str__(self) -> str:
+        return self.value
+
+    @classmethod
+    def parse(cls, value: Any) -> Union['Source', Any]:
+        """The Source for a known value, else the value unchanged"""
+        try:
+            return cls(value)
+        except ValueError:
+            return value
+
+
+class Item:
+    """
+    One normalized event or reservation.
+
+    Fields are fixed slots instead of a per-item dict. The date, time sort
+    key and lower-cased location are derived once here so filtering,
+    indexing and sorting don't re-derive them per request. get() and [] are
+    kept so code written against the old dicts still works; templates use
+    attribute access.
+    """
+
+    FIELDS = (
+        'source', 'feed', 'id', 'title', 'location', 'space',
+        'start_datetime', 'end_datetime', 'start_date', 'start_time', 'end_date', 'end_time',
+        'duration', 'status', 'access_status', 'capacity', 'enrollment', 'description',
+        'merged_from', 'recurrence', 'recurrence_id',
+    )
+    __slots__ = FIELDS + ('day', 'date_ordinal', 'sort_key', 'location_key')
+
+    def __init__(self, **fields):
+        for name in self.FIELDS:
+            setattr(self, name, fields.pop(name, None))
+        if fields:
+            raise TypeError(f"Unknown item fields: {', '.join(sorted(fields))}")
+        self.source = Source.parse(self.source)
+        if self.feed is None and self.source is not None:
+            self.feed = str(self.source)  # the classic one-feed-per-source setup
+        self._derive()
+
+    def _derive(self):
+        self.day = derive_date(self.start_datetime, self.start_date)
+        self.date_ordinal = self.day.toordinal() if self.day else None
+        self.sort_key = derive_sort_key(self.start_datetime, self.start_time, self.title)
+        self.location_key = (self.location or self.space or '').lower()
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """dict-style access to a field"""
+        if name in _ITEM_SLOTS:
+            return getattr(self, name)
+        return default
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in _ITEM_SLOTS:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The item's fields as a plain dict (derived fields left out)"""
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.FIELDS)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.FIELDS, state):
+            setattr(self, name, value)
+        self._derive()
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Item):
+            return NotImplemented
+        return self.__getstate__() == other.__getstate__()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Item(source={str(self.source)!r}, id={self.id!r}, title={self.title!r})"
+
+
+_ITEM_SLOTS = frozenset(Item.__slots__)
+
+
+def derive_date(start_datetime: Any, start_date: Any) -> Optional[date]:
+    """Date of an item from start_datetime, else a start_date string"""
+    if start_datetime:
+        if isinstance(start_datetime, datetime):
+            # The local day, matching derive_sort_key
+            return date_parsing.to_local(start_datetime).date()
+        elif isinstance(start_datetime, date):
+            return start_datetime
+
+    if start_date:
+        if isinstance(start_date, date):
+            return start_date
+        if isinstance(start_date, str):
+            # MM/DD/YYYY or YYYY-MM-DD only, no guessing
+            return date_parsing.parse_date(start_date, fallback=False)
+
+    return None
+
+
+def derive_sort_key(start_datetime: Any, start_time: Any, title: Any) -> Any:
+    """Key that orders items by start time (title when there is no time)"""
+    if start_datetime:
+        if isinstance(start_datetime, datetime):
+            # Naive local time so aware and naive datetimes compare
+            return date_parsing.to_local(start_datetime)
+        elif isinstance(start_datetime, date):
+            return start_datetime
+    if isinstance(start_time, str) and start_time:
+        # Parse time like "07:00 PM"
+        parsed = date_parsing.parse_time(start_time)
+        if parsed is not None:
+            return parsed
+    return title if title is not None else ''
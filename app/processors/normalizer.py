@@ -1,70 +1,79 @@
 """Data normalization for events and reservations"""
 import logging
-from datetime import datetime
+from datetime import datetime, time
 from typing import Dict, Optional
-from dateutil import parser as date_parser
+from app.processors import recurrence
+from app.processors.models import Item
+from app.utils import date_parsing
 
 logger = logging.getLogger(__name__)
 
-def normalize_event(event: Dict) -> Dict:
+def normalize_event(event: Dict) -> Item:
     """Normalize a Wild Apricot event"""
-    normalized = {
-        'source': event.get('source', 'wild-apricot'),
-        'id': event.get('id') or event.get('event_id'),
-        'title': event.get('title', 'Untitled Event'),
-        'location': normalize_location(event.get('location')),
-        'space': normalize_location(event.get('location')),  # location and space are synonymous
-        'start_datetime': normalize_datetime(event),
-        'end_datetime': None,  # Wild Apricot HTML doesn't provide end time
-        'start_date': None,
-        'start_time': None,
-        'end_date': None,
-        'end_time': None,
-        'access_status': event.get('access_status', 'unknown'),
-        'capacity': event.get('capacity'),
-        'enrollment': event.get('enrollment'),
-        'description': event.get('description')
-    }
+    # Local time, like reservations, so the date/time strings, the item's
+    # day and its sort key all agree
+    start_datetime = date_parsing.to_local(normalize_datetime(event))
     
-    # Extract date/time from start_datetime
-    if normalized['start_datetime']:
-        normalized['start_date'] = normalized['start_datetime'].strftime('%Y-%m-%d')
-        normalized['start_time'] = normalized['start_datetime'].strftime('%I:%M %p')
-    
-    return normalized
+    return Item(
+        source=event.get('source', 'wild-apricot'),
+        feed=event.get('feed'),
+        id=event.get('id') or event.get('event_id'),
+        title=event.get('title', 'Untitled Event'),
+        location=normalize_location(event.get('location')),
+        space=normalize_location(event.get('location')),  # location and space are synonymous
+        start_datetime=start_datetime,
+        end_datetime=None,  # Wild Apricot HTML doesn't provide end time
+        # Extract date/time from start_datetime
+        start_date=start_datetime.strftime('%Y-%m-%d') if start_datetime else None,
+        start_time=start_datetime.strftime('%I:%M %p') if start_datetime else None,
+        end_date=None,
+        end_time=None,
+        access_status=event.get('access_status', 'unknown'),
+        capacity=event.get('capacity'),
+        enrollment=event.get('enrollment'),
+        description=event.get('description')
+    )
 
 
-def normalize_reservation(reservation: Dict) -> Dict:
+def normalize_reservation(reservation: Dict) -> Item:
     """Normalize a Skedda reservation"""
-    # Convert timezone-aware datetimes to naive (remove timezone info)
-    start_dt = reservation.get('start_datetime')
-    if start_dt and hasattr(start_dt, 'tzinfo') and start_dt.tzinfo is not None:
-        # Convert to naive datetime (local time)
-        start_dt = start_dt.replace(tzinfo=None)
-    
-    end_dt = reservation.get('end_datetime')
-    if end_dt and hasattr(end_dt, 'tzinfo') and end_dt.tzinfo is not None:
-        # Convert to naive datetime (local time)
-        end_dt = end_dt.replace(tzinfo=None)
+    # Convert timezone-aware datetimes to naive local time; the date/time
+    # strings then follow the converted values
+    fields = {}
+    for name in ('start', 'end'):
+        value = reservation.get(f'{name}_datetime')
+        fields[f'{name}_date'] = reservation.get(f'{name}_date')
+        fields[f'{name}_time'] = reservation.get(f'{name}_time')
+        if isinstance(value, datetime) and value.tzinfo is not None:
+            value = date_parsing.to_local(value)
+            fields[f'{name}_date'] = value.strftime('%Y-%m-%d')
+            fields[f'{name}_time'] = value.strftime('%I:%M %p')
+        fields[f'{name}_datetime'] = value
+    start_dt = fields['start_datetime']
     
-    normalized = {
-        'source': reservation.get('source', 'skedda'),
-        'id': reservation.get('id'),
-        'title': reservation.get('title', 'Reservation'),
-        'location': normalize_location(reservation.get('location') or reservation.get('space')),
-        'space': normalize_location(reservation.get('space') or reservation.get('location')),
-        'start_datetime': start_dt,
-        'end_datetime': end_dt,
-        'start_date': reservation.get('start_date'),
-        'start_time': reservation.get('start_time'),
-        'end_date': reservation.get('end_date'),
-        'end_time': reservation.get('end_time'),
-        'duration': reservation.get('duration'),
-        'status': reservation.get('status', 'CONFIRMED'),
-        'description': reservation.get('description')
-    }
+    recurrence_id = date_parsing.to_local(reservation.get('recurrence_id'))
     
-    return normalized
+    return Item(
+        source=reservation.get('source', 'skedda'),
+        feed=reservation.get('feed'),
+        id=reservation.get('id'),
+        title=reservation.get('title', 'Reservation'),
+        location=normalize_location(reservation.get('location') or reservation.get('space')),
+        space=normalize_location(reservation.get('space') or reservation.get('location')),
+        start_datetime=fields['start_datetime'],
+        end_datetime=fields['end_datetime'],
+        start_date=fields['start_date'],
+        start_time=fields['start_time'],
+        end_date=fields['end_date'],
+        end_time=fields['end_time'],
+        duration=reservation.get('duration'),
+        status=reservation.get('status', 'CONFIRMED'),
+        description=reservation.get('description'),
+        recurrence=recurrence.recurrence_of(
+            reservation.get('rrule'), reservation.get('rdates'), reservation.get('exdates'), start_dt
+        ),
+        recurrence_id=recurrence_id
+    )
 
 
 def normalize_location(location: Optional[str]) -> Optional[str]:
@@ -83,35 +92,16 @@ def normalize_datetime(event: Dict) -> Optional[datetime]:
     
     # Try parsing from date and time strings
     if event.get('start_date') and event.get('start_time'):
-        try:
-            date_str = f"{event['start_date']} {event['start_time']}"
-            # Handle different date formats
-            if '/' in event['start_date']:
-                # Format: MM/DD/YYYY
-                dt_str = date_str.replace('/', '-')
-                # Try parsing
-                try:
-                    return date_parser.parse(date_str, fuzzy=True)
-                except:
-                    pass
-            else:
-                try:
-                    return date_parser.parse(date_str, fuzzy=True)
-                except:
-                    pass
-        except Exception as e:
-            logger.debug(f"Could not parse datetime: {e}")
+        parsed = date_parsing.parse_datetime(f"{event['start_date']} {event['start_time']}", fuzzy=True)
+        if parsed:
+            return parsed
     
     # Try parsing just date
     if event.get('start_date'):
-        try:
-            if '/' in event['start_date']:
-                # MM/DD/YYYY format
-                return datetime.strptime(event['start_date'], '%m/%d/%Y')
-            else:
-                return date_parser.parse(event['start_date'])
-        except:
-            pass
+        if '/' in event['start_date']:
+            # MM/DD/YYYY format
+            day = date_parsing.parse_date(event['start_date'], fallback=False)
+            return datetime.combine(day, time()) if day else None
+        return date_parsing.parse_datetime(event['start_date'])
     
     return None
-
@@ -0,0 +1,148 @@
+"""Parsed query parameters compiled into a single-pass item query"""
+import logging
+from collections import defaultdict
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional
+from app.processors.filter import resolve_date_range
+from app.processors.index import DateIndex, LocationIndex
+from app.processors.models import Item
+from app.processors.organizer import sort_by_time
+from app.processors.recurrence import RecurrenceExpander
+
+logger = logging.getLogger(__name__)
+
+
+class Query:
+    """
+    What the old filter chain (source, location, date range, past events,
+    organize by date) did in six passes, folded into a date window plus
+    one predicate. run() evaluates it in a single pass over a list of
+    items; run_indexed() reads the window from a DateIndex instead.
+    Both return items grouped by date and sorted by time, like
+    organize_by_date. Recurring masters are replaced by their occurrences
+    inside the window.
+    """
+
+    def __init__(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        include_undated: bool = True,
+        source: Optional[str] = None,
+        location: Optional[str] = None
+    ):
+        self.start = start
+        self.end = end
+        self.include_undated = include_undated
+        self.source = source
+        self.location = location
+        self._start_ordinal = start.toordinal() if start else None
+        self._end_ordinal = end.toordinal() if end else None
+
+    def __repr__(self) -> str:
+        return (f"Query(start={self.start}, end={self.end}, include_undated={self.include_undated}, "
+                f"source={self.source!r}, location={self.location!r})")
+
+    def matches(self, item: Item) -> bool:
+        """True if the item belongs in the result"""
+        if self.source and item.source != self.source and item.feed != self.source:
+            return False
+        if self.location and self.location not in item.location_key:
+            return False
+        ordinal = item.date_ordinal
+        if ordinal is None:
+            return self.include_undated
+        if self._start_ordinal is not None and ordinal < self._start_ordinal:
+            return False
+        return self._end_ordinal is None or ordinal <= self._end_ordinal
+
+    def run(self, items: Iterable[Item]) -> Dict[Optional[date], List[Item]]:
+        """Match, group and sort items in one pass"""
+        groups = defaultdict(list)
+        matches = self.matches
+        recurring = []
+        for item in items:
+            if item.recurrence_id is not None:
+                recurring.append(item)  # an override, needed to expand its master
+            if item.recurrence:
+                recurring.append(item)
+            elif matches(item):
+                groups[item.day].append(item)
+        if recurring:
+            for item in RecurrenceExpander(recurring).occurrences(self.start, self.end):
+                if matches(item):
+                    groups[item.day].append(item)
+        return {day: sort_by_time(group) for day, group in groups.items()}
+
+    def run_indexed(
+        self,
+        date_index: DateIndex,
+        location_index: Optional[LocationIndex] = None,
+        recurring: Optional[RecurrenceExpander] = None
+    ) -> Dict[Optional[date], List[Item]]:
+        """
+        Same result as run(), reading the date window from the index so
+        only items inside it are looked at. With a location index the
+        location test is a set lookup of precomputed candidates. Recurring
+        masters' occurrences in the window come from recurring.
+        """
+        result = date_index.lookup(
+            self.start,
+            self.end,
+            include_undated=self.include_undated,
+            keep=self._item_filter(location_index)
+        )
+        if recurring:
+            added = defaultdict(list)
+            for item in recurring.occurrences(self.start, self.end):
+                if self.matches(item):
+                    added[item.day].append(item)
+            for day, group in added.items():
+                # Index groups may be shared lists; build new ones
+                result[day] = sort_by_time(result.get(day, []) + group)
+        return result
+
+    def _item_filter(self, location_index: Optional[LocationIndex]) -> Optional[Callable[[Item], bool]]:
+        """Source/location check for items already inside the date window"""
+        source = self.source
+        location = self.location
+        if not source and not location:
+            return None
+        if location and location_index is not None:
+            candidates = location_index.candidates(location)
+
+            def keep(item):
+                return (not source or item.source == source or item.feed == source) and id(item) in candidates
+        else:
+            def keep(item):
+                if source and item.source != source and item.feed != source:
+                    return False
+                return not location or location in item.location_key
+        return keep
+
+
+def compile_query(params: Dict, today: Optional[date] = None) -> Query:
+    """Compile parse_query_params output into a Query"""
+    today = today or date.today()
+    start, end = resolve_date_range(
+        start_date=params.get('start'),
+        end_date=params.get('end'),
+        date_range=params.get('range'),
+        specific_date=params.get('date'),
+        today=today
+    )
+    # Undated items only survive when no date filter applies
+    include_undated = not start and not end
+    # Past items are dropped by moving the window's start up to today
+    if params.get('filter_past', True):
+        start = max(start, today) if start else today
+
+    source = params.get('source')
+    location = (params.get('location') or '').lower().strip()
+    return Query(
+        start=start,
+        end=end,
+        include_undated=include_undated,
+        source=source if source and source != 'all' else None,
+        location=location or None
+    )
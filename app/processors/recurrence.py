@@ -0,0 +1,171 @@
+"""
+Lazy expansion of recurring (RRULE/RDATE/EXDATE) reservations.
+
+A recurring reservation stays one master item whose `recurrence` holds
+its rule. Occurrences are only generated for the date window a query
+asks for, and are memoized per (UID, window): a next-month query expands
+one month of an open-ended weekly booking, not every week it will ever
+have.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+from app.config import Config
+from app.processors.models import Item
+from app.utils import date_parsing
+
+logger = logging.getLogger(__name__)
+
+# (RRULE text or None, RDATE starts, EXDATE starts), naive local datetimes
+Recurrence = Tuple[Optional[str], Tuple[datetime, ...], Tuple[datetime, ...]]
+
+
+def recurrence_of(
+    rrule: Optional[str],
+    rdates: Optional[Iterable[Any]],
+    exdates: Optional[Iterable[Any]],
+    start: Any
+) -> Optional[Recurrence]:
+    """
+    The recurrence of a reservation starting at start, or None if it
+    doesn't recur. Only reservations with a start datetime can recur.
+    """
+    if not (rrule or rdates) or not isinstance(start, datetime):
+        return None
+    return (rrule or None, _naive_starts(rdates, start), _naive_starts(exdates, start))
+
+
+def _naive_starts(values: Optional[Iterable[Any]], start: datetime) -> Tuple[datetime, ...]:
+    """Sorted naive local datetimes; DATE values take the master's start time"""
+    starts = set()
+    for value in values or ():
+        if isinstance(value, datetime):
+            starts.add(date_parsing.to_local(value))
+        elif isinstance(value, date):
+            starts.add(datetime.combine(value, start.time()))
+    return tuple(sorted(starts))
+
+
+def occurrence_starts(
+    item: Item,
+    window_start: datetime,
+    window_end: datetime,
+    skip: Iterable[datetime] = ()
+) -> List[datetime]:
+    """
+    Starts of item's occurrences within [window_start, window_end], less
+    skip. dateutil generates them in order and stops past window_end.
+    """
+    from dateutil.rrule import rruleset, rrulestr  # deferred until something recurs
+
+    rule, rdates, exdates = item.recurrence
+    dtstart = item.start_datetime.replace(tzinfo=None)
+    rules = rruleset()
+    rules.rdate(dtstart)  # DTSTART is always the first occurrence
+    if rule:
+        try:
+            rules.rrule(rrulestr(rule, dtstart=dtstart, ignoretz=True))
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Ignoring invalid RRULE {rule!r} of {item.id}: {e}")
+    for value in rdates:
+        rules.rdate(value)
+    for value in exdates:
+        rules.exdate(value)
+    for value in skip:
+        rules.exdate(value)
+    return rules.between(window_start, window_end, inc=True)
+
+
+def occurrence(item: Item, start: datetime) -> Item:
+    """The item moved to start (same duration), marked by recurrence_id"""
+    fields = item.to_dict()
+    fields.update(
+        recurrence=None,
+        recurrence_id=start,
+        start_datetime=start,
+        start_date=start.strftime('%Y-%m-%d'),
+        start_time=start.strftime('%I:%M %p')
+    )
+    if isinstance(item.end_datetime, datetime):
+        end = start + (item.end_datetime.replace(tzinfo=None) - item.start_datetime.replace(tzinfo=None))
+        fields.update(
+            end_datetime=end,
+            end_date=end.strftime('%Y-%m-%d'),
+            end_time=end.strftime('%I:%M %p')
+        )
+    return Item(**fields)
+
+
+class RecurrenceExpander:
+    """
+    The recurring masters among a snapshot's items. occurrences() expands
+    them for one date window; each master's expansion is memoized per
+    window in a bounded LRU. Overrides (items with a RECURRENCE-ID of
+    the same feed and UID) replace the occurrence they name.
+    """
+
+    def __init__(self, items: Iterable[Item], max_memoized: Optional[int] = None):
+        items = list(items)
+        overridden: Dict[Tuple[str, Any], set] = {}
+        for item in items:
+            if item.recurrence is None and isinstance(item.recurrence_id, (date, datetime)):
+                overridden.setdefault((item.feed, item.id), set()).add(item.recurrence_id)
+
+        # One master per UID (a later duplicate replaces an earlier one)
+        self._masters: Dict[Tuple[str, Any], Tuple[Item, FrozenSet[datetime]]] = {}
+        for item in items:
+            if item.recurrence:
+                key = (item.feed, item.id)
+                skip = _naive_starts(overridden.get(key), item.start_datetime)
+                self._masters[key] = (item, frozenset(skip))
+
+        self._max_memoized = max_memoized if max_memoized is not None else Config.RECURRENCE_CACHE_SIZE
+        self._memo: 'OrderedDict[Tuple, List[Item]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        logger.debug(f"Recurring masters: {len(self._masters)}")
+
+    def __len__(self) -> int:
+        return len(self._masters)
+
+    def occurrences(self, start: Optional[date] = None, end: Optional[date] = None) -> List[Item]:
+        """
+        Occurrences of every master starting on a day within [start, end].
+        Without an end, expansion stops RECURRENCE_HORIZON_DAYS after the
+        start (or today).
+        """
+        if not self._masters:
+            return []
+        if end is None:
+            end = (start or date.today()) + timedelta(days=Config.RECURRENCE_HORIZON_DAYS)
+        window_start = datetime.combine(start, time.min) if start else datetime.min
+        window_end = datetime.combine(end, time.max)
+
+        found = []
+        for key, (item, skip) in self._masters.items():
+            found.extend(self._expand(key + (start, end), item, skip, window_start, window_end))
+        return found
+
+    def _expand(self, key, item, skip, window_start, window_end) -> List[Item]:
+        with self._lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self._memo.move_to_end(key)
+                self._hits += 1
+                return cached
+            self._misses += 1
+
+        expanded = [occurrence(item, start) for start in occurrence_starts(item, window_start, window_end, skip)]
+        with self._lock:
+            self._memo[key] = expanded
+            while len(self._memo) > self._max_memoized:
+                self._memo.popitem(last=False)
+        return expanded
+
+    def stats(self) -> Dict[str, int]:
+        """Memo hits, misses and current entry count"""
+        with self._lock:
+            return {'hits': self._hits, 'misses': self._misses, 'entries': len(self._memo)}
@@ -1,54 +1,158 @@
 """Application routes"""
+import hashlib
+import json
 import logging
-from flask import Blueprint, render_template, request, url_for
-from concurrent.futures import ThreadPoolExecutor
-from app.data_fetchers import wild_apricot, skedda
-from app.processors import normalizer, merger, filter as filter_module, organizer
-from app.utils import query_parser, qrcode_gen
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+from flask import Blueprint, Response, abort, current_app, g, make_response, render_template, request, url_for
+from app.data_fetchers.circuit import CircuitBreaker
+from app.data_fetchers.fetch_engine import FetchResult
+from app.data_fetchers.registry import FeedRegistry, configured_feeds
+from app.data_fetchers.snapshot import SnapshotStore, Snapshot
+from app.data_fetchers.shared_snapshot import SharedSnapshotFile
+from app.processors.conflicts import Conflict
+from app.processors.models import Item
+from app.processors.query import compile_query
+from app.utils import date_parsing, json_stream, metrics, query_parser, qrcode_gen
+from app.utils.page_cache import CachedPage, PageCache
 from app.config import Config
 
 logger = logging.getLogger(__name__)
 bp = Blueprint('content_manager', __name__)
 
-# Thread pool for parallel data fetching
-executor = ThreadPoolExecutor(max_workers=2)
+# Views with a QR code on the master page
+MASTER_QR_VIEWS = {
+    'today_kiosk': '/display?range=today&format=kiosk',
+    'this_week_desktop': '/display?range=this-week&format=desktop',
+    'all_mobile': '/display?format=mobile',
+}
 
+# Configured feeds, fetched on a FETCH_WORKERS thread pool. Concurrent
+# fetches of a feed share one in-flight job, and failing feeds are left
+# alone for a while (circuit breaker) instead of retried every refresh.
+feed_registry = FeedRegistry(configured_feeds(), Config.FETCH_WORKERS)
+fetch_flight = feed_registry.flight
+circuit_breakers = feed_registry.breakers
 
-def fetch_all_data():
-    """Fetch data from both sources in parallel"""
+
+def fetch_from_upstream() -> FetchResult:
+    """
+    Fetch all feeds in parallel within FETCH_DEADLINE. Feeds that fail
+    or run out of time are left out, so one slow feed can't blank the others.
+    """
+    return feed_registry.fetch(Config.FETCH_DEADLINE)
+
+
+def _snapshot_file() -> Optional[SharedSnapshotFile]:
+    """Snapshot file on local disk, if persisting or sharing is enabled"""
+    if not (Config.SNAPSHOT_PERSIST or Config.SNAPSHOT_SHARED):
+        return None
     try:
-        # Fetch in parallel
-        future_wa = executor.submit(wild_apricot.fetch_wild_apricot_events)
-        future_sk = executor.submit(skedda.fetch_skedda_reservations)
-        
-        events = future_wa.result(timeout=Config.FETCH_TIMEOUT)
-        reservations = future_sk.result(timeout=Config.FETCH_TIMEOUT)
-        
-        return events, reservations
-    except Exception as e:
-        logger.error(f"Error fetching data: {e}")
-        return [], []
+        return SharedSnapshotFile(Config.SNAPSHOT_PATH)
+    except OSError as e:
+        logger.warning(f"Snapshot file disabled, cannot use {Config.SNAPSHOT_PATH}: {e}")
+        return None
+
+
+def _shared_snapshot_file(snapshot_file: Optional[SharedSnapshotFile]) -> Optional[SharedSnapshotFile]:
+    """The snapshot file, if it may also be shared between workers"""
+    if snapshot_file is None or not Config.SNAPSHOT_SHARED:
+        return None
+    if not SharedSnapshotFile.is_supported():
+        logger.warning("Shared snapshot needs POSIX file locks; using per-worker snapshots")
+        return None
+    return snapshot_file
+
+
+snapshot_file = _snapshot_file()
+
+# Latest data snapshot, refreshed in the background
+snapshot_store = SnapshotStore(
+    fetch_from_upstream,
+    ttl=Config.SNAPSHOT_TTL,
+    refresh_interval=Config.SNAPSHOT_REFRESH_INTERVAL,
+    cold_start_wait=Config.FETCH_DEADLINE,
+    shared=_shared_snapshot_file(snapshot_file),
+    persist=snapshot_file
+)
+
+
+# Rendered /display pages keyed by canonical params and date, per snapshot
+page_cache = PageCache(Config.PAGE_CACHE_SIZE)
+
+# Rendered kiosk day sections per view for the current snapshot version
+_fragment_cache: Dict = {}
+
+# Kiosk update stream responses with and without changes
+stream_stats = {'changed': 0, 'unchanged': 0}
+
+# Section hashes behind each signature handed to a kiosk, so the short
+# signature it sends back still tells which day sections it has
+_signature_sections: 'OrderedDict[str, Dict[str, str]]' = OrderedDict()
+_signature_lock = threading.Lock()
+
+
+def get_snapshot() -> Snapshot:
+    """Return the latest data snapshot (never blocks on upstream once warm)"""
+    with metrics.timed('snapshot'):
+        return snapshot_store.get()
+
+
+@bp.app_context_processor
+def inject_feed_labels() -> Dict:
+    """Display label per feed name, for templates"""
+    return {'feed_labels': feed_registry.labels}
+
+
+@bp.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@bp.after_request
+def send_server_timing(response: Response) -> Response:
+    """Send the stage timings of this request as a Server-Timing header"""
+    started = g.get('request_started')
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    endpoint = (request.endpoint or 'unknown').rsplit('.', 1)[-1]
+    metrics.registry.observe('request', endpoint, elapsed)
+    # Streamed bodies (/api/items) are produced after this point
+    metrics.add_server_timing('total', elapsed)
+    response.headers['Server-Timing'] = metrics.server_timing_header(g.server_timing)
+    return response
+
+
+def master_qr_codes(base_url: str) -> Dict[str, str]:
+    """QR codes for the views linked from the master page"""
+    return {
+        name: qrcode_gen.generate_qr_code(f"{base_url}{path}")
+        for name, path in MASTER_QR_VIEWS.items()
+    }
 
 
 @bp.route('/')
 @bp.route('/events')
 def master_page():
     """Master page with links and QR codes"""
-    # Fetch data to show summary
-    events, reservations = fetch_all_data()
+    # Read the current snapshot to show summary
+    snapshot = get_snapshot()
+    events, reservations = snapshot.events, snapshot.reservations
     
-    # Generate QR codes for common views
+    # QR codes for common views (memoized, usually warmed at startup)
     base_url = request.url_root.rstrip('/')
-    qr_codes = {
-        'today_kiosk': qrcode_gen.generate_qr_code(f"{base_url}/display?range=today&format=kiosk"),
-        'this_week_desktop': qrcode_gen.generate_qr_code(f"{base_url}/display?range=this-week&format=desktop"),
-        'all_mobile': qrcode_gen.generate_qr_code(f"{base_url}/display?format=mobile"),
-    }
+    qr_codes = master_qr_codes(base_url)
     
     return render_template('master.html', 
                          events_count=len(events),
                          reservations_count=len(reservations),
                          qr_codes=qr_codes,
+                         snapshot=snapshot,
                          base_url=base_url)
 
 
@@ -58,43 +162,33 @@ def display():
     # Parse query parameters
     params = query_parser.parse_query_params(request.args)
     
-    # Fetch data
-    events_raw, reservations_raw = fetch_all_data()
-    
-    # Normalize data
-    events = [normalizer.normalize_event(e) for e in events_raw]
-    reservations = [normalizer.normalize_reservation(r) for r in reservations_raw]
-    
-    # Merge
-    all_items = merger.merge_events_and_reservations(events, reservations)
-    
-    # Apply filters
-    # Source filter
-    filtered = filter_module.filter_by_source(all_items, params['source'])
+    # Read the current snapshot (items are normalized and merged on refresh)
+    snapshot = get_snapshot()
     
-    # Location filter
-    if params['location']:
-        filtered = filter_module.filter_by_location(filtered, params['location'])
-    
-    # Date filter
-    filtered = filter_module.filter_by_date_range(
-        filtered,
-        start_date=params['start'],
-        end_date=params['end'],
-        date_range=params['range'],
-        specific_date=params['date']
-    )
-    
-    # Filter past events
-    if params['filter_past']:
-        filtered = filter_module.filter_past_events(filtered, filter_past=True)
+    # The page depends only on the parsed params, the snapshot and today's date
+    base_url = request.url_root.rstrip('/')
+    canonical_query = query_parser.canonical_query(params)
+    cache_key = (base_url, canonical_query, date.today())
+    page = page_cache.get(cache_key, snapshot.version)
+    metrics.add_server_timing('page-cache', description='miss' if page is None else 'hit')
+    if page is None:
+        body = render_display(params, snapshot, base_url, canonical_query)
+        page = page_cache.put(cache_key, snapshot.version, body)
     
-    # Organize by date
-    organized = organizer.organize_by_date(filtered)
+    return cached_page_response(page)
+
+
+def render_display(params: Dict, snapshot: Snapshot, base_url: str, canonical_query: str) -> str:
+    """Filter, organize and render the display page for parsed params"""
+    with metrics.timed('query'):
+        organized = select_items(params, snapshot)
     
-    # Generate QR code for current view
-    current_url = request.url
-    qr_code = qrcode_gen.generate_qr_code(current_url)
+    # Generate QR code for the canonical URL of this view
+    current_url = f"{base_url}/display"
+    if canonical_query:
+        current_url = f"{current_url}?{canonical_query}"
+    with metrics.timed('qr'):
+        qr_code = qrcode_gen.generate_qr_code(current_url)
     
     # Select template based on format
     template_map = {
@@ -105,12 +199,391 @@ def display():
     }
     template = template_map.get(params['format'], 'desktop.html')
     
-    return render_template(template,
-                         items_by_date=organized,
-                         params=params,
-                         qr_code=qr_code,
-                         current_url=current_url,
-                         base_url=request.url_root.rstrip('/'))
+    # Kiosks patch their day sections from the update stream
+    signature = stream_url = None
+    if template == 'kiosk.html':
+        with metrics.timed('fragments'):
+            signature = fragments_signature(day_fragments(params, snapshot, canonical_query, organized))
+        stream_url = f"{base_url}/display/stream?{urlencode([('since', signature)])}"
+        if canonical_query:
+            stream_url = f"{stream_url}&{canonical_query}"
+    
+    with metrics.timed('render'):
+        return render_template(template,
+                             items_by_date=organized,
+                             signature=signature,
+                             stream_url=stream_url,
+                             params=params,
+                             qr_code=qr_code,
+                             current_url=current_url,
+                             snapshot=snapshot,
+                             base_url=base_url)
+
+
+def select_items(params: Dict, snapshot: Snapshot) -> Dict[Optional[date], List[Item]]:
+    """Items matching parsed params, grouped by date and sorted by time"""
+    # One compiled query over the snapshot's date and location indexes
+    # replaces the merge/filter/organize chain
+    return compile_query(params).run_indexed(snapshot.date_index, snapshot.location_index, snapshot.recurring)
+
+
+def cached_page_response(page: CachedPage) -> Response:
+    """Response for a cached page; 304 when the client's ETag still matches"""
+    response = make_response(page.body)
+    response.set_etag(page.etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    response = response.make_conditional(request)
+    if response.status_code == 304:
+        page_cache.record_not_modified()
+    return response
+
+
+@bp.route('/display/stream')
+def display_stream():
+    """
+    Server-Sent Events for kiosks: sends a 'changed' event carrying the
+    re-rendered day sections whose content differs from what the client
+    has (Last-Event-ID, or ?since= on first connect), then closes.
+    The retry field makes the browser reconnect every SSE_RETRY_MS, so a
+    sync gunicorn worker is never held by an idle kiosk. A signature this
+    worker doesn't know gets every section.
+    """
+    params = query_parser.parse_query_params(request.args)
+    snapshot = get_snapshot()
+    canonical_query = query_parser.canonical_query(params)
+    with metrics.timed('fragments'):
+        fragments = day_fragments(params, snapshot, canonical_query)
+    signature = fragments_signature(fragments)
+    
+    known = request.headers.get('Last-Event-ID') or request.args.get('since', '')
+    lines = [f"retry: {Config.SSE_RETRY_MS}"]
+    if known != signature:
+        known_hashes = known_sections(known)
+        payload = {
+            'order': list(fragments),
+            'days': {
+                key: html
+                for key, (digest, html) in fragments.items()
+                if known_hashes.get(key) != digest
+            },
+            'updated': snapshot.last_updated.strftime('%m/%d/%Y %I:%M %p') if snapshot.last_updated else None,
+        }
+        lines += [f"id: {signature}", "event: changed", f"data: {json.dumps(payload)}"]
+        stream_stats['changed'] += 1
+    else:
+        lines.append(': unchanged')
+        stream_stats['unchanged'] += 1
+    
+    return Response('\n'.join(lines) + '\n\n',
+                    mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def day_fragments(
+    params: Dict,
+    snapshot: Snapshot,
+    canonical_query: str,
+    organized: Optional[Dict] = None
+) -> Dict[str, Tuple[str, str]]:
+    """
+    Rendered kiosk day sections for a view, keyed by ISO date ('undated'
+    for items without a date) in display order, with a short content hash.
+    Memoized per snapshot version and date.
+    """
+    cache_key = (canonical_query, date.today())
+    if _fragment_cache.get('version') != snapshot.version:
+        _fragment_cache.clear()
+        _fragment_cache['version'] = snapshot.version
+    fragments = _fragment_cache.get(cache_key)
+    if fragments is not None:
+        return fragments
+    
+    if organized is None:
+        organized = select_items(params, snapshot)
+    fragments = {}
+    for date_key in sorted(organized, key=lambda d: (d is None, d or date.min)):
+        html = render_template('_kiosk_day.html', date_key=date_key, items=organized[date_key])
+        digest = hashlib.blake2b(html.encode('utf-8'), digest_size=4).hexdigest()
+        fragments[date_key.isoformat() if date_key else 'undated'] = (digest, html)
+    
+    if len(_fragment_cache) > Config.PAGE_CACHE_SIZE:
+        version = _fragment_cache['version']
+        _fragment_cache.clear()
+        _fragment_cache['version'] = version
+    _fragment_cache[cache_key] = fragments
+    return fragments
+
+
+def fragments_signature(fragments: Dict[str, Tuple[str, str]]) -> str:
+    """
+    Short fixed-length id of the sections of a view and their hashes (it
+    travels in the stream URL, which must stay under the request-line
+    limit however many days the view has). The per-day hashes are kept
+    for known_sections.
+    """
+    sections = {key: digest for key, (digest, _) in fragments.items()}
+    described = '.'.join(f"{key}~{digest}" for key, digest in sections.items())
+    signature = hashlib.blake2b(described.encode('utf-8'), digest_size=8).hexdigest()
+    with _signature_lock:
+        _signature_sections[signature] = sections
+        _signature_sections.move_to_end(signature)
+        while len(_signature_sections) > Config.PAGE_CACHE_SIZE * 4:
+            _signature_sections.popitem(last=False)
+    return signature
+
+
+def known_sections(signature: str) -> Dict[str, str]:
+    """Section hashes behind a signature from fragments_signature; {} if unknown"""
+    with _signature_lock:
+        return _signature_sections.get(signature, {})
+
+
+@bp.route('/api/items')
+def api_items():
+    """
+    Filtered items as JSON, in display order (by date, then time, undated
+    last). Takes the /display parameters plus:
+      fields  comma-separated item fields to include (default: all)
+      limit   page size (default API_PAGE_SIZE, at most API_MAX_PAGE_SIZE)
+      cursor  next_cursor from the previous page
+    The body is streamed one item at a time.
+    """
+    params = query_parser.parse_query_params(request.args)
+    snapshot = get_snapshot()
+    with metrics.timed('query'):
+        organized = select_items(params, snapshot)
+    
+    days = {
+        (date_key.isoformat() if date_key else 'undated'): items
+        for date_key, items in organized.items()
+    }
+    # ISO dates sort chronologically and 'undated' sorts after them
+    day_keys = sorted(days)
+    
+    try:
+        limit = int(request.args.get('limit', Config.API_PAGE_SIZE))
+    except ValueError:
+        limit = Config.API_PAGE_SIZE
+    limit = max(1, min(limit, Config.API_MAX_PAGE_SIZE))
+    fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
+    
+    day_pos, index = 0, 0
+    if request.args.get('cursor'):
+        cursor = json_stream.decode_cursor(request.args['cursor'])
+        if cursor is None:
+            return Response(json.dumps({'error': 'invalid cursor'}), status=400,
+                            mimetype='application/json')
+        day_pos, index = json_stream.resume_position(day_keys, days, cursor)
+    
+    trailer = {'next_cursor': None, 'count': 0, 'updated': snapshot.last_updated}
+    
+    def page():
+        """Yield up to limit items from the resume position, then set the cursor"""
+        pos, i = day_pos, index
+        while pos < len(day_keys) and trailer['count'] < limit:
+            items = days[day_keys[pos]]
+            if i >= len(items):
+                pos, i = pos + 1, 0
+                continue
+            yield items[i]
+            trailer['count'] += 1
+            i += 1
+        # Days are never empty, so anything past this position is more items
+        has_more = pos < len(day_keys) - 1 or (pos < len(day_keys) and i < len(days[day_keys[pos]]))
+        if trailer['count'] and has_more:
+            key = day_keys[pos]
+            trailer['next_cursor'] = json_stream.encode_cursor(key, i - 1, days[key][i - 1].get('id'))
+    
+    return Response(json_stream.iter_items_document(page(), fields, trailer),
+                    mimetype='application/json',
+                    headers={'Cache-Control': 'no-cache'})
+
+
+@bp.route('/availability')
+def availability():
+    """
+    Free/busy per space at a moment (?at=, default now) or during a range
+    (?from=&until=, or ?range=this-afternoon etc.), from the snapshot's
+    occupancy index. ?location= narrows the spaces, ?format=kiosk is the
+    lobby screen layout.
+    """
+    params = query_parser.parse_availability_params(request.args)
+    snapshot = get_snapshot()
+    with metrics.timed('availability'):
+        location = params['location'].lower() if params['location'] else None
+        spaces = snapshot.availability.between(params['start'], params['end'], location)
+    
+    with metrics.timed('render'):
+        body = render_template('availability.html',
+                               spaces=spaces,
+                               ranges=query_parser.AVAILABILITY_RANGES,
+                               params=params,
+                               snapshot=snapshot,
+                               base_url=request.url_root.rstrip('/'))
+    response = make_response(body)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@bp.route('/conflicts')
+def conflicts_page():
+    """
+    Wild Apricot events and Skedda reservations booked into the same
+    space at overlapping times. Takes the /display date and location
+    parameters (default: from today on).
+    """
+    params = query_parser.parse_query_params(request.args)
+    snapshot = get_snapshot()
+    with metrics.timed('conflicts'):
+        conflicts_by_date = {}
+        for conflict in select_conflicts(params, snapshot):
+            conflicts_by_date.setdefault(conflict.start.date(), []).append(conflict)
+    
+    with metrics.timed('render'):
+        body = render_template('conflicts.html',
+                               conflicts_by_date=conflicts_by_date,
+                               params=params,
+                               snapshot=snapshot,
+                               base_url=request.url_root.rstrip('/'))
+    response = make_response(body)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@bp.route('/api/conflicts')
+def api_conflicts():
+    """The /conflicts report as JSON, ordered by start"""
+    params = query_parser.parse_query_params(request.args)
+    snapshot = get_snapshot()
+    with metrics.timed('conflicts'):
+        conflicts = [conflict.to_dict() for conflict in select_conflicts(params, snapshot)]
+    body = json.dumps(
+        {'conflicts': conflicts, 'count': len(conflicts), 'updated': snapshot.last_updated},
+        default=json_stream.json_default, separators=(',', ':')
+    )
+    return Response(body, mimetype='application/json', headers={'Cache-Control': 'no-cache'})
+
+
+def select_conflicts(params: Dict, snapshot: Snapshot) -> List[Conflict]:
+    """Conflicts of the snapshot starting inside the params' date window and location"""
+    query = compile_query(params)
+    return [
+        conflict for conflict in snapshot.conflicts.conflicts
+        if (query.start is None or conflict.start.date() >= query.start)
+        and (query.end is None or conflict.start.date() <= query.end)
+        and (not query.location or query.location in conflict.space.lower())
+    ]
+
+
+@bp.route('/metrics')
+def metrics_endpoint():
+    """
+    Prometheus text metrics of this worker: stage and request latency
+    histograms, cache hit counters, upstream fetch status, item counts
+    and circuit breaker states. Each gunicorn worker keeps its own.
+    """
+    if not Config.METRICS_ENABLED:
+        abort(404)
+    return Response('\n'.join(collect_metrics()) + '\n',
+                    mimetype='text/plain; version=0.0.4',
+                    headers={'Cache-Control': 'no-cache'})
+
+
+def collect_metrics() -> List[str]:
+    """Lines of the /metrics page"""
+    snapshot = snapshot_store.current
+    lines = []
+    lines += metrics.format_histograms(
+        'content_manager_stage_seconds', 'Time spent per pipeline stage', 'stage',
+        metrics.registry.histograms('stage'))
+    lines += metrics.format_histograms(
+        'content_manager_request_seconds', 'Request handling time until the response is returned', 'endpoint',
+        metrics.registry.histograms('request'))
+    
+    # Cache hits and misses, with the hit ratio since the worker started
+    qr_info = qrcode_gen.qr_cache_info()
+    page_stats = page_cache.stats()
+    parse_stats = date_parsing.parse_stats()
+    caches = {
+        'page': (page_stats['hits'], page_stats['misses']),
+        'qr': (qr_info.hits, qr_info.misses),
+    }
+    for name in ('date', 'time', 'datetime'):
+        caches[f'parse_{name}'] = (parse_stats[f'{name}_hits'], parse_stats[f'{name}_misses'])
+    recurrence_stats = snapshot.recurring.stats()
+    caches['recurrence'] = (recurrence_stats['hits'], recurrence_stats['misses'])
+    lines += metrics.format_metric(
+        'content_manager_cache_hits_total', 'counter', 'Cache lookups answered from the cache',
+        [({'cache': name}, hits) for name, (hits, _) in caches.items()])
+    lines += metrics.format_metric(
+        'content_manager_cache_misses_total', 'counter', 'Cache lookups that had to compute the value',
+        [({'cache': name}, misses) for name, (_, misses) in caches.items()])
+    lines += metrics.format_metric(
+        'content_manager_cache_hit_ratio', 'gauge', 'Share of cache lookups that hit',
+        [({'cache': name}, hits / (hits + misses) if hits + misses else None)
+         for name, (hits, misses) in caches.items()])
+    lines += metrics.format_metric(
+        'content_manager_page_not_modified_total', 'counter', 'Display requests answered with 304',
+        [({}, page_stats['not_modified'])])
+    lines += metrics.format_metric(
+        'content_manager_kiosk_stream_total', 'counter', 'Kiosk update stream responses',
+        [({'result': result}, count) for result, count in stream_stats.items()])
+    lines += metrics.format_metric(
+        'content_manager_date_parse_fallback_total', 'counter', 'Date strings that needed dateutil or failed',
+        [({'result': result}, parse_stats[result]) for result in ('fallback', 'failed')])
+    
+    # Upstream fetches
+    fetch_stats = {name: feed.stats() for name, feed in feed_registry.feeds.items()}
+    for counter, help_text in (
+        ('requests', 'HTTP requests sent upstream'),
+        ('not_modified', 'Upstream requests answered with 304'),
+        ('parse_skipped', 'Upstream responses reused without parsing'),
+        ('bytes_transferred', 'Bytes read from upstream'),
+    ):
+        lines += metrics.format_metric(
+            f'content_manager_upstream_{counter}_total', 'counter', help_text,
+            [({'feed': name}, stats[counter]) for name, stats in fetch_stats.items()])
+    flight_stats = fetch_flight.stats()
+    lines += metrics.format_metric(
+        'content_manager_upstream_coalesced_total', 'counter', 'Fetches that joined one already in flight',
+        [({'feed': name}, stats['coalesced']) for name, stats in flight_stats.items()])
+    statuses = snapshot.sources.values()
+    lines += metrics.format_metric(
+        'content_manager_upstream_fetch_seconds', 'gauge', 'Duration of the latest fetch per feed',
+        [({'feed': status.name}, status.elapsed) for status in statuses])
+    lines += metrics.format_metric(
+        'content_manager_upstream_up', 'gauge', 'Whether the latest fetch per feed succeeded',
+        [({'feed': status.name}, status.ok) for status in statuses])
+    lines += metrics.format_metric(
+        'content_manager_upstream_data_age_seconds', 'gauge', 'Age of the data served per feed',
+        [({'feed': status.name}, status.age) for status in statuses])
+    lines += metrics.format_metric(
+        'content_manager_circuit_state', 'gauge', 'Circuit breaker state per feed (1 for the current state)',
+        [({'feed': name, 'state': state}, breaker.state == state)
+         for name, breaker in circuit_breakers.items()
+         for state in (CircuitBreaker.CLOSED, CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN)])
+    
+    # Snapshot contents
+    item_counts = Counter((item.feed, str(item.source)) for item in snapshot.items)
+    lines += metrics.format_metric(
+        'content_manager_items', 'gauge', 'Items in the current snapshot per feed',
+        [({'feed': feed, 'source': source}, count) for (feed, source), count in sorted(item_counts.items())])
+    lines += metrics.format_metric(
+        'content_manager_conflicts', 'gauge', 'Overlapping event/reservation pairs in the current snapshot',
+        [({}, len(snapshot.conflicts))])
+    lines += metrics.format_metric(
+        'content_manager_snapshot_version', 'gauge', 'Version of the snapshot being served',
+        [({}, snapshot.version)])
+    lines += metrics.format_metric(
+        'content_manager_snapshot_age_seconds', 'gauge', 'Seconds since the served snapshot was fetched',
+        [({}, snapshot.age)])
+    
+    startup = current_app.extensions.get('startup_report')
+    if startup is not None:
+        lines += metrics.format_metric(
+            'content_manager_startup_seconds', 'gauge', 'Time create_app took in this worker',
+            [({}, startup.total_ms / 1000)])
+    return lines
 
 
 @bp.errorhandler(404)
@@ -1,10 +1,91 @@
 // Minimal JavaScript for compatibility
-// Auto-refresh for kiosk mode
+// Kiosk mode: patch day sections in place from the update stream, or
+// reload every 5 minutes on browsers without EventSource (IE11) and when
+// the stream fails
 (function() {
-    if (window.location.search.includes('format=kiosk')) {
+    var RELOAD_MS = 300000; // 5 minutes
+
+    var container = document.getElementById('kiosk-days');
+    if (!container) {
+        return;
+    }
+
+    function reloadLater() {
         setTimeout(function() {
             window.location.reload();
-        }, 300000); // 5 minutes
+        }, RELOAD_MS);
     }
-})();
 
+    function currentSections() {
+        var sections = {};
+        var children = container.children;
+        for (var i = 0; i < children.length; i++) {
+            sections[children[i].getAttribute('data-date')] = children[i];
+        }
+        return sections;
+    }
+
+    function patchDays(update) {
+        var sections = currentSections();
+        var key;
+
+        // Swap in the day sections that changed
+        for (key in update.days) {
+            if (!update.days.hasOwnProperty(key)) {
+                continue;
+            }
+            var holder = document.createElement('div');
+            holder.innerHTML = update.days[key];
+            var fresh = holder.firstElementChild;
+            if (sections[key]) {
+                container.replaceChild(fresh, sections[key]);
+            } else {
+                container.appendChild(fresh);
+            }
+            sections[key] = fresh;
+        }
+
+        // Put sections in server order and drop days that are gone
+        var wanted = {};
+        for (var i = 0; i < update.order.length; i++) {
+            wanted[update.order[i]] = true;
+            container.appendChild(sections[update.order[i]]);
+        }
+        for (key in sections) {
+            if (sections.hasOwnProperty(key) && !wanted[key]) {
+                container.removeChild(sections[key]);
+            }
+        }
+
+        var empty = document.querySelector('.kiosk-no-items');
+        if (empty) {
+            empty.style.display = update.order.length ? 'none' : '';
+        }
+        var timestamp = document.getElementById('timestamp');
+        if (timestamp && update.updated) {
+            timestamp.textContent = update.updated;
+        }
+    }
+
+    var streamUrl = container.getAttribute('data-stream-url');
+    if (!window.EventSource || !streamUrl) {
+        reloadLater();
+        return;
+    }
+
+    var source = new EventSource(streamUrl);
+    // A non-200 reply closes the stream for good; fall back to reloading
+    source.onerror = function() {
+        if (source.readyState === EventSource.CLOSED) {
+            source.close();
+            reloadLater();
+        }
+    };
+    source.addEventListener('changed', function(event) {
+        try {
+            patchDays(JSON.parse(event.data));
+        } catch (e) {
+            window.location.reload();
+        }
+    });
+})();
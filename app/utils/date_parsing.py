@@ -0,0 +1,177 @@
+"""
+Date/time parsing for the formats our feeds and query strings use.
+
+Exact formats (ISO 8601 with offset, %Y-%m-%d, %m/%d/%Y, %I:%M %p) are
+parsed by hand; results are memoized per string. dateutil is only used
+as a last resort. Its results are not memoized (it completes partial
+strings like 'Oct 20' from today's date), and every call counts as a
+fallback so an unexpected feed format shows in parse_stats().
+"""
+import logging
+import threading
+from datetime import date, datetime, time
+from functools import lru_cache
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Distinct strings remembered per parser
+CACHE_SIZE = 4096
+
+_stats_lock = threading.Lock()
+_stats = {'fallback': 0, 'failed': 0}
+
+
+def parse_date(text: str, fallback: bool = True) -> Optional[date]:
+    """
+    Date from 'YYYY-MM-DD' or 'MM/DD/YYYY' (dateutil for anything else
+    when fallback is set). None if it can't be parsed.
+    """
+    if isinstance(text, datetime):
+        return text.date()
+    if isinstance(text, date):
+        return text
+    if not text:
+        return None
+    value = _parse_date(text)
+    if value is None and fallback:
+        parsed = _dateutil(text)
+        value = parsed.date() if parsed is not None else None
+    return value
+
+
+def parse_time(text: str) -> Optional[time]:
+    """Time from 'HH:MM AM/PM'; None if it can't be parsed"""
+    if not text:
+        return None
+    return _parse_time(text)
+
+
+def parse_datetime(text: str, fuzzy: bool = False) -> Optional[datetime]:
+    """
+    Datetime from ISO 8601 (offset or Z allowed), or a date in either
+    supported format optionally followed by ' HH:MM AM/PM'. Anything else
+    goes to dateutil (fuzzy if requested). None if it can't be parsed.
+    """
+    if isinstance(text, datetime):
+        return text
+    if not text:
+        return None
+    value = _parse_datetime(text)
+    if value is None:
+        value = _dateutil(text.strip(), fuzzy)
+    return value
+
+
+def to_local(value):
+    """
+    An aware datetime converted to the server's local time and made
+    naive; naive datetimes (already local) and anything else unchanged
+    """
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def parse_stats() -> Dict[str, int]:
+    """How often parsing needed dateutil or failed, plus memo hit counts"""
+    with _stats_lock:
+        stats = dict(_stats)
+    for name, cached in (('date', _parse_date), ('time', _parse_time), ('datetime', _parse_datetime)):
+        info = cached.cache_info()
+        stats[f'{name}_hits'] = info.hits
+        stats[f'{name}_misses'] = info.misses
+    return stats
+
+
+def _count(name: str):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_date(text: str) -> Optional[date]:
+    value = _fast_date(text)
+    if value is not None:
+        return value
+    for fmt in ('%Y-%m-%d', '%m/%d/%Y'):
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            pass
+    return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_time(text: str) -> Optional[time]:
+    value = _fast_time(text)
+    if value is not None:
+        return value
+    try:
+        return datetime.strptime(text, '%I:%M %p').time()
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_datetime(text: str) -> Optional[datetime]:
+    text = text.strip()
+    if len(text) > 10 and text[4:5] == '-' and text[10] == 'T':
+        try:
+            return datetime.fromisoformat(text[:-1] + '+00:00' if text.endswith('Z') else text)
+        except ValueError:
+            pass
+    date_part, _, time_part = text.partition(' ')
+    day = _fast_date(date_part)
+    if day is not None:
+        if not time_part:
+            return datetime.combine(day, time())
+        clock = _fast_time(time_part.strip())
+        if clock is not None:
+            return datetime.combine(day, clock)
+    return None
+
+
+def _fast_date(text: str) -> Optional[date]:
+    """YYYY-MM-DD or M/D/YYYY without going through strptime"""
+    try:
+        if len(text) == 10 and text[4] == '-' and text[7] == '-':
+            year, month, day = text[:4], text[5:7], text[8:]
+        else:
+            month, day, year = text.split('/')
+            if len(year) != 4 or not 0 < len(month) <= 2 or not 0 < len(day) <= 2:
+                return None
+        if not (year.isdigit() and month.isdigit() and day.isdigit()):
+            return None
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def _fast_time(text: str) -> Optional[time]:
+    """H:MM AM/PM (12-hour clock) without going through strptime"""
+    try:
+        clock, meridiem = text.split(' ')
+        hour, minute = clock.split(':')
+        meridiem = meridiem.upper()
+        if not (hour.isdigit() and minute.isdigit()) or len(hour) > 2 or len(minute) != 2:
+            return None
+        if meridiem not in ('AM', 'PM') or not 1 <= int(hour) <= 12:
+            return None
+        return time(int(hour) % 12 + (12 if meridiem == 'PM' else 0), int(minute))
+    except ValueError:
+        return None
+
+
+def _dateutil(text: str, fuzzy: bool = False) -> Optional[datetime]:
+    """The counted slow path"""
+    from dateutil import parser as date_parser  # only loaded if ever needed
+    
+    _count('fallback')
+    logger.debug(f"Falling back to dateutil for {text!r}")
+    try:
+        return date_parser.parse(text, fuzzy=fuzzy)
+    except (ValueError, OverflowError) as e:
+        _count('failed')
+        logger.debug(f"Could not parse {text!r}: {e}")
+        return None
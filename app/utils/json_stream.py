@@ -0,0 +1,76 @@
+"""Streaming JSON serialization and cursors for the items API"""
+import base64
+import json
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+def json_default(value):
+    """Serialize dates/datetimes as ISO strings, anything else via str()"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def dump_item(item: Dict, fields: Optional[Sequence[str]] = None) -> str:
+    """One item as a JSON object, optionally limited to fields"""
+    if fields:
+        data = {field: item.get(field) for field in fields}
+    else:
+        data = item.to_dict() if hasattr(item, 'to_dict') else dict(item)
+    return json.dumps(data, default=json_default, separators=(',', ':'))
+
+
+def iter_items_document(
+    items: Iterable[Dict],
+    fields: Optional[Sequence[str]],
+    trailer: Dict
+) -> Iterator[str]:
+    """
+    Yield a {"items": [...], ...trailer} document piece by piece, one
+    item per chunk, so the full response is never built as one string.
+    trailer values are read after the items are exhausted.
+    """
+    yield '{"items":['
+    first = True
+    for item in items:
+        yield dump_item(item, fields) if first else ',' + dump_item(item, fields)
+        first = False
+    yield '],'
+    yield json.dumps(trailer, default=json_default, separators=(',', ':'))[1:]
+
+
+def encode_cursor(day_key: str, index: int, item_id: Optional[str]) -> str:
+    """Opaque cursor pointing just after an item"""
+    raw = json.dumps([day_key, index, item_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[str, int, Optional[str]]]:
+    """Inverse of encode_cursor; None for anything malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        day_key, index, item_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return str(day_key), int(index), item_id
+    except Exception:
+        return None
+
+
+def resume_position(day_keys: List[str], days: Dict[str, List[Dict]], cursor) -> Tuple[int, int]:
+    """
+    (day position, index within day) to continue from after cursor.
+    Stays correct when items were added/removed since the cursor was
+    issued: the item is found again by id, else by its old position.
+    """
+    day_key, index, item_id = cursor
+    if day_key not in days:
+        later = [i for i, key in enumerate(day_keys) if key > day_key]
+        return (later[0], 0) if later else (len(day_keys), 0)
+    day_pos = day_keys.index(day_key)
+    items = days[day_key]
+    if index < len(items) and items[index].get('id') == item_id:
+        return day_pos, index + 1
+    for i, item in enumerate(items):
+        if item_id is not None and item.get('id') == item_id:
+            return day_pos, i + 1
+    return day_pos, min(index, len(items))
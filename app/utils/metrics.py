@@ -0,0 +1,145 @@
+"""
+Stage timings for Server-Timing headers and the /metrics endpoint.
+
+Wrap a unit of work in `timed('stage')`: its duration goes into a
+per-process histogram and, when it runs inside a request, into that
+request's Server-Timing header. Work done by the background refresher
+(fetch, parse, normalize) only shows in the histograms, unless a cold
+start made the request wait for it.
+
+The Prometheus text helpers at the bottom format counters, gauges and
+histograms; routes collects the values.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from flask import g, has_request_context
+
+# Histogram bucket upper bounds (seconds)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Dict[str, str]
+
+
+class Histogram:
+    """Bucketed durations, plus their sum and count"""
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last bucket is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le, count) pairs as Prometheus expects, ending with +Inf"""
+        pairs, total = [], 0
+        for bound, count in zip(BUCKETS + (float('inf'),), self.counts):
+            total += count
+            pairs.append(('+Inf' if bound == float('inf') else repr(bound), total))
+        return pairs
+
+
+class MetricsRegistry:
+    """Histograms per family and label value, shared by all threads of a worker"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[str, Histogram]] = {}
+
+    def observe(self, family: str, label: str, seconds: float):
+        with self._lock:
+            histograms = self._histograms.setdefault(family, {})
+            histogram = histograms.get(label)
+            if histogram is None:
+                histogram = histograms[label] = Histogram()
+            histogram.observe(seconds)
+
+    def histograms(self, family: str) -> Dict[str, Histogram]:
+        """Copies of the histograms of one family, by label value"""
+        with self._lock:
+            copies = {}
+            for label, histogram in self._histograms.get(family, {}).items():
+                copy = copies[label] = Histogram()
+                copy.counts, copy.sum, copy.count = list(histogram.counts), histogram.sum, histogram.count
+            return copies
+
+
+registry = MetricsRegistry()
+
+
+@contextmanager
+def timed(stage: str, description: Optional[str] = None) -> Iterator[None]:
+    """Time a block as stage (histogram, and Server-Timing in a request)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        registry.observe('stage', stage, elapsed)
+        add_server_timing(stage, elapsed, description)
+
+
+def add_server_timing(name: str, seconds: Optional[float] = None, description: Optional[str] = None):
+    """Add an entry to the current request's Server-Timing header"""
+    if has_request_context():
+        g.setdefault('server_timing', []).append((name, seconds, description))
+
+
+def server_timing_header(entries: Iterable[Tuple[str, Optional[float], Optional[str]]]) -> str:
+    """Server-Timing value, e.g. 'query;dur=1.2, cache;desc="hit"'"""
+    parts = []
+    for name, seconds, description in entries:
+        part = name
+        if seconds is not None:
+            part += f";dur={seconds * 1000:.1f}"
+        if description:
+            part += f';desc="{description}"'
+        parts.append(part)
+    return ', '.join(parts)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(labels: Optional[Labels]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _number(value: float) -> str:
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def format_metric(name: str, kind: str, help_text: str, samples: Iterable[Tuple[Labels, float]]) -> List[str]:
+    """Lines of one counter/gauge family; samples with a None value are skipped"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        if value is not None:
+            lines.append(f"{name}{_labels(labels)} {_number(value)}")
+    return lines
+
+
+def format_histograms(name: str, help_text: str, label: str, histograms: Dict[str, Histogram]) -> List[str]:
+    """Lines of one histogram family, one histogram per label value"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for value in sorted(histograms):
+        histogram = histograms[value]
+        for le, count in histogram.cumulative():
+            lines.append(f"{name}_bucket{_labels({label: value, 'le': le})} {count}")
+        lines.append(f"{name}_sum{_labels({label: value})} {_number(histogram.sum)}")
+        lines.append(f"{name}_count{_labels({label: value})} {histogram.count}")
+    return lines
@@ -0,0 +1,72 @@
+"""Rendered-page cache with strong ETags"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CachedPage:
+    """Rendered HTML body and its strong ETag"""
+
+    __slots__ = ('body', 'etag')
+
+    def __init__(self, body: str):
+        self.body = body.encode('utf-8')
+        self.etag = hashlib.blake2b(self.body, digest_size=16).hexdigest()
+
+
+class PageCache:
+    """
+    Bounded LRU of rendered pages. Entries belong to one data snapshot
+    version; storing a page for a newer version drops everything older.
+    The ETag is a hash of the body, so workers rendering the same bytes
+    hand out the same ETag.
+    """
+
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, CachedPage]' = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'not_modified': 0}
+
+    def get(self, key: Hashable, version: int) -> Optional[CachedPage]:
+        """Cached page for key at this snapshot version, or None"""
+        with self._lock:
+            page = self._entries.get(key) if version == self._version else None
+            if page is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return page
+
+    def put(self, key: Hashable, version: int, body: str) -> CachedPage:
+        """Store a freshly rendered page and return it"""
+        page = CachedPage(body)
+        with self._lock:
+            if self._version is None or version > self._version:
+                self._entries.clear()
+                self._version = version
+            elif version < self._version:
+                return page  # rendered from an older snapshot; don't keep it
+            self._entries[key] = page
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return page
+
+    def record_not_modified(self):
+        """Count a conditional request answered with 304"""
+        with self._lock:
+            self._stats['not_modified'] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Hits, misses, 304 responses and current entry count"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            return stats
@@ -1,27 +1,88 @@
 """QR code generation"""
-import qrcode
 import io
 import base64
+from functools import lru_cache
 from typing import Optional
+from urllib.parse import quote
 from app.config import Config
 
-def generate_qr_code(url: str) -> str:
-    """Generate QR code as base64-encoded PNG"""
+# Characters left unescaped in SVG data URIs (quotes are single quotes)
+_SVG_URI_SAFE = "/:=',."
+
+def generate_qr_code(url: str, output: Optional[str] = None) -> str:
+    """
+    Generate QR code as a data URI.
+    output is 'png' (base64 PNG) or 'svg' (URL-encoded SVG path, no Pillow);
+    defaults to Config.QR_CODE_FORMAT. Results are memoized per URL/settings.
+    """
+    return _render_qr_code(
+        url,
+        Config.QR_CODE_ERROR_CORRECTION,
+        Config.QR_CODE_SIZE,
+        Config.QR_CODE_BORDER,
+        (output or Config.QR_CODE_FORMAT).lower()
+    )
+
+
+def qr_cache_info():
+    """Hit/miss/size counters of the QR code cache"""
+    return _render_qr_code.cache_info()
+
+
+@lru_cache(maxsize=Config.QR_CACHE_SIZE)
+def _render_qr_code(url: str, error_correction: str, size: int, border: int, output: str) -> str:
+    """Render one QR code (cached by all arguments)"""
+    # qrcode (and Pillow, for PNGs) load on the first render
+    import qrcode
+    
     qr = qrcode.QRCode(
         version=1,
-        error_correction=getattr(qrcode.constants, f'ERROR_CORRECT_{Config.QR_CODE_ERROR_CORRECTION}'),
-        box_size=Config.QR_CODE_SIZE,
-        border=Config.QR_CODE_BORDER,
+        error_correction=getattr(qrcode.constants, f'ERROR_CORRECT_{error_correction}'),
+        box_size=size,
+        border=border,
     )
     qr.add_data(url)
     qr.make(fit=True)
-    
+
+    if output == 'svg':
+        return _svg_data_uri(qr.get_matrix(), size)
+
     img = qr.make_image(fill_color="black", back_color="white")
-    
+
     # Convert to base64
     buffer = io.BytesIO()
     img.save(buffer, format='PNG')
     img_str = base64.b64encode(buffer.getvalue()).decode()
-    
+
     return f"data:image/png;base64,{img_str}"
 
+
+def _svg_data_uri(matrix, box_size: int) -> str:
+    """
+    Draw each horizontal run of dark modules as one stroke of a single
+    path (relative moves within a row) and wrap it in a data URI.
+    """
+    n = len(matrix)
+    path = []
+    for y, row in enumerate(matrix):
+        x = 0
+        run_end = None
+        while x < n:
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < n and row[x]:
+                x += 1
+            if run_end is None:
+                path.append(f"M{start},{y}.5h{x - start}")
+            else:
+                path.append(f"m{start - run_end},0h{x - start}")
+            run_end = x
+    svg = (
+        f"<svg xmlns='http://www.w3.org/2000/svg' width='{n * box_size}' height='{n * box_size}' "
+        f"viewBox='0 0 {n} {n}' shape-rendering='crispEdges'>"
+        f"<rect width='{n}' height='{n}' fill='white'/>"
+        f"<path stroke='black' d='{''.join(path)}'/></svg>"
+    )
+    return f"data:image/svg+xml;charset=utf-8,{quote(svg, safe=_SVG_URI_SAFE)}"
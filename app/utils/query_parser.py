@@ -1,8 +1,10 @@
 """Query parameter parsing and validation"""
 import logging
-from datetime import datetime, date
+from datetime import date, datetime, time
 from typing import Dict, Optional
-from dateutil import parser as date_parser
+from urllib.parse import urlencode
+from app.data_fetchers.registry import source_names
+from app.utils import date_parsing
 
 logger = logging.getLogger(__name__)
 
@@ -60,8 +62,8 @@ def parse_query_params(request_args: Dict) -> Dict:
     # Source filter
     if 'source' in request_args:
         source_val = request_args['source'].lower()
-        valid_sources = ['wild-apricot', 'skedda', 'all']
-        if source_val in valid_sources:
+        # A source type or the name of a configured feed
+        if source_val == 'all' or source_val in source_names():
             params['source'] = source_val
     
     # Format
@@ -74,16 +76,104 @@ def parse_query_params(request_args: Dict) -> Dict:
     return params
 
 
-def parse_date(date_str: str) -> date:
-    """Parse date string to date object"""
-    try:
-        # Try ISO format first (YYYY-MM-DD)
-        return datetime.strptime(date_str, '%Y-%m-%d').date()
-    except:
+# /availability windows: today's (start, end) times; None means now
+AVAILABILITY_RANGES = {
+    'now': (None, None),
+    'this-morning': (time(8), time(12)),
+    'this-afternoon': (time(12), time(17)),
+    'this-evening': (time(17), time(22)),
+    'rest-of-today': (None, time.max),
+}
+
+
+def parse_availability_params(request_args: Dict, now: Optional[datetime] = None) -> Dict:
+    """
+    Parse /availability parameters into a window: at (a moment), from/until
+    (a range; until defaults to the end of from's day) or range (one of
+    AVAILABILITY_RANGES, default 'now'). Times without a date are today.
+    """
+    now = (now or datetime.now()).replace(second=0, microsecond=0)
+    params = {
+        'start': now,
+        'end': now,
+        'range': 'now',
+        'location': None,
+        'format': 'desktop',
+    }
+    
+    if 'range' in request_args:
+        range_val = request_args['range'].lower()
+        if range_val in AVAILABILITY_RANGES:
+            start, end = AVAILABILITY_RANGES[range_val]
+            params['range'] = range_val
+            params['start'] = datetime.combine(now.date(), start) if start else now
+            params['end'] = datetime.combine(now.date(), end) if end else params['start']
+    
+    if 'at' in request_args:
+        moment = parse_moment(request_args['at'], now)
+        if moment is not None:
+            params.update(start=moment, end=moment, range=None)
+    elif 'from' in request_args:
+        start = parse_moment(request_args['from'], now)
+        if start is not None:
+            end = parse_moment(request_args.get('until', ''), start) if request_args.get('until') else None
+            if end is None or end < start:
+                end = datetime.combine(start.date(), time.max)
+            params.update(start=start, end=end, range=None)
+    
+    if request_args.get('location', '').strip():
+        params['location'] = request_args['location'].strip()
+    
+    if request_args.get('format', '').lower() in ('kiosk', 'desktop'):
+        params['format'] = request_args['format'].lower()
+    
+    return params
+
+
+def parse_moment(text: str, today: datetime) -> Optional[datetime]:
+    """
+    Naive local datetime from ISO 8601 or 'YYYY-MM-DD HH:MM AM/PM'; a bare
+    time ('14:30', '2:30 PM') is on today's date. None if unrecognized.
+    """
+    text = (text or '').strip()
+    if not text:
+        return None
+    clock = date_parsing.parse_time(text)
+    if clock is None:
         try:
-            # Try MM/DD/YYYY
-            return datetime.strptime(date_str, '%m/%d/%Y').date()
-        except:
-            # Try dateutil parser
-            return date_parser.parse(date_str).date()
+            clock = datetime.strptime(text, '%H:%M').time()
+        except ValueError:
+            clock = None
+    if clock is not None:
+        return datetime.combine(today.date(), clock)
+    parsed = date_parsing.parse_datetime(text)
+    if parsed is None:
+        logger.warning(f"Invalid availability time: {text!r}")
+        return None
+    return date_parsing.to_local(parsed)
+
+
+def canonical_query(params: Dict) -> str:
+    """
+    Stable query string for parsed parameters: fixed key order, defaults
+    and synonyms (space) left out. Equal views give equal strings.
+    """
+    defaults = {'source': 'all', 'format': 'desktop'}
+    pairs = []
+    for key in ('date', 'start', 'end', 'range', 'location', 'source', 'format'):
+        value = params.get(key)
+        if value is None or value == '' or value == defaults.get(key):
+            continue
+        if isinstance(value, date):
+            value = value.isoformat()
+        pairs.append((key, value))
+    return urlencode(pairs)
 
+
+def parse_date(date_str: str) -> date:
+    """Parse date string to date object"""
+    # YYYY-MM-DD and MM/DD/YYYY take the fast path, anything else dateutil
+    parsed = date_parsing.parse_date(date_str)
+    if parsed is None:
+        raise ValueError(f"Unrecognized date: {date_str!r}")
+    return parsed
@@ -0,0 +1,47 @@
+"""Request coalescing (single-flight) for upstream fetches"""
+import logging
+import threading
+from concurrent.futures import Executor, Future
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Share one in-flight call per key between concurrent callers.
+    The first caller submits the work; callers arriving while it is still
+    running get the same Future instead of queueing a duplicate job.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def submit(self, key: str, executor: Executor, fn: Callable, *args, **kwargs) -> Future:
+        """Return the in-flight Future for key, or submit fn to executor"""
+        with self._lock:
+            stats = self._stats.setdefault(key, {'calls': 0, 'executions': 0, 'coalesced': 0})
+            stats['calls'] += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                stats['coalesced'] += 1
+                logger.debug(f"Coalesced call for '{key}' onto in-flight fetch")
+                return future
+            future = executor.submit(fn, *args, **kwargs)
+            stats['executions'] += 1
+            self._in_flight[key] = future
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-key counters: calls, executions and coalesced callers"""
+        with self._lock:
+            return {key: dict(counts) for key, counts in self._stats.items()}
+
+    def _forget(self, key: str, future: Future):
+        """Drop a finished call so the next caller starts a fresh one"""
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
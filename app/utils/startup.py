@@ -0,0 +1,115 @@
+"""
+Startup timing for the app factory.
+
+StartupReport times the phases of create_app and, while tracing, every
+module imported for the first time (self time, without the modules it
+imported in turn). The report is logged once per process and compared
+against STARTUP_BUDGET_MS.
+
+Run `python -m app.utils.startup` for the full report of a fresh process.
+"""
+import builtins
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Modules listed in the logged report
+TOP_MODULES = 10
+
+
+class StartupReport:
+    """Phase and per-module import timings of one app start"""
+
+    def __init__(self, started: Optional[float] = None):
+        self.started = started if started is not None else time.perf_counter()
+        self.finished: Optional[float] = None
+        self.phases: List[Tuple[str, float]] = []
+        self.imports: Dict[str, float] = {}
+
+    @property
+    def total_ms(self) -> float:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return (end - self.started) * 1000
+
+    def add_phase(self, name: str, seconds: float):
+        self.phases.append((name, seconds))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a block of startup work"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - started)
+
+    @contextmanager
+    def tracing_imports(self) -> Iterator[None]:
+        """Record self time of modules first imported inside the block"""
+        original_import = builtins.__import__
+        stack: List[float] = []  # child time accumulated per open import
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules:
+                return original_import(name, globals, locals, fromlist, level)
+            stack.append(0.0)
+            started = time.perf_counter()
+            try:
+                return original_import(name, globals, locals, fromlist, level)
+            finally:
+                elapsed = time.perf_counter() - started
+                children = stack.pop()
+                self.imports[name] = self.imports.get(name, 0.0) + elapsed - children
+                if stack:
+                    stack[-1] += elapsed
+
+        builtins.__import__ = timed_import
+        try:
+            yield
+        finally:
+            builtins.__import__ = original_import
+
+    def top_imports(self, count: int = TOP_MODULES) -> List[Tuple[str, float]]:
+        """Slowest imports as (module, milliseconds)"""
+        ranked = sorted(self.imports.items(), key=lambda kv: kv[1], reverse=True)
+        return [(name, seconds * 1000) for name, seconds in ranked[:count]]
+
+    def finish(self, budget_ms: Optional[float] = None) -> 'StartupReport':
+        """Stop the clock and log the report (a warning when over budget)"""
+        self.finished = time.perf_counter()
+        phases = ', '.join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.phases)
+        imports = ', '.join(f"{name} {ms:.1f}ms" for name, ms in self.top_imports())
+        message = f"Startup took {self.total_ms:.0f}ms ({phases}); slowest imports: {imports or 'none'}"
+        if budget_ms and self.total_ms > budget_ms:
+            logger.warning(f"{message} - over the {budget_ms:.0f}ms startup budget")
+        else:
+            logger.info(message)
+        return self
+
+    def as_dict(self) -> Dict:
+        return {
+            'total_ms': round(self.total_ms, 1),
+            'phases': {name: round(seconds * 1000, 1) for name, seconds in self.phases},
+            'imports_ms': {name: round(ms, 2) for name, ms in self.top_imports(len(self.imports))},
+        }
+
+
+def main():
+    """Print the startup report of a fresh app as JSON"""
+    import json
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    from app import create_app
+    app = create_app()
+    report = app.extensions['startup_report']
+    print(json.dumps(report.as_dict(), indent=2))
+    budget = app.config.get('STARTUP_BUDGET_MS')
+    if budget and report.total_ms > budget:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
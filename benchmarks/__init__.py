@@ -0,0 +1 @@
+"""Benchmarks for the fetch, parse, filter and render hot paths"""
@@ -0,0 +1,93 @@
+"""Synthetic Wild Apricot JSON and Skedda iCal feeds"""
+import json
+import random
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+# Feed sizes accepted on the command line
+SIZES = {'100': 100, '10k': 10_000, '100k': 100_000}
+
+SPACES = [
+    'Events Bay Lounge', 'Classroom 1', 'Classroom 2', 'Laser Room', 'Wood Shop Main Zone',
+    'Metal Shop', 'Electronics Lab', '3D Printing Area', 'Textiles Studio', 'Conference Room',
+]
+
+CLASS_NAMES = [
+    'Intro to Laser Cutting', 'Woodshop Safety', 'Arduino Basics', 'MIG Welding',
+    'Sewing Machine Checkout', '3D Printer Orientation', 'Open Shop', 'Members Meeting',
+    'CNC Router Sign-off', 'Soldering 101',
+]
+
+
+def parse_size(value: str) -> int:
+    """'100' / '10k' / '100k' (or any integer) to an item count"""
+    if value in SIZES:
+        return SIZES[value]
+    return int(value)
+
+
+def make_wild_apricot_json(count: int, seed: int = 1, today: Optional[date] = None) -> bytes:
+    """
+    A /api/digital_sign/events response with count events spread from a
+    week ago to a year ahead, in the shape wautils returns.
+    """
+    rnd = random.Random(seed)
+    today = today or date.today()
+    events = []
+    for i in range(count):
+        day = today + timedelta(days=rnd.randint(-7, 365))
+        start = datetime.combine(day, time(rnd.randint(8, 21), rnd.choice((0, 15, 30, 45))))
+        limit = rnd.choice((None, 6, 8, 12, 20))
+        name = rnd.choice(CLASS_NAMES)
+        if rnd.random() < 0.05:
+            name = f"CANCELED - {name}"
+        events.append({
+            'uid': 100_000 + i,
+            'name': f"{name} #{i}",
+            'location': rnd.choice(SPACES),
+            'event_type': 'class',
+            'start_date': start.strftime('%Y-%m-%dT%H:%M:%S.000-05:00'),
+            'registrations_limit': limit,
+            'confirmed_registrations_count': rnd.randint(0, limit or 10),
+            'active_registrations_count': rnd.randint(0, limit or 10),
+            'pending_registrations_count': rnd.randint(0, 2),
+        })
+    return json.dumps({'generated_at': f"{today.isoformat()}T00:00:00", 'events': events}).encode('utf-8')
+
+
+def make_skedda_ical(count: int, seed: int = 2, today: Optional[date] = None) -> bytes:
+    """
+    A Skedda-style iCal feed with count bookings spread over the default
+    parsing horizon, mixing UTC and TZID times and folded descriptions.
+    """
+    rnd = random.Random(seed)
+    today = today or date.today()
+    lines = ['BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//Skedda//Skedda Calendar//EN',
+             'X-WR-CALNAME:Nova Labs']
+    for i in range(count):
+        day = today + timedelta(days=rnd.randint(-31, 366))
+        start = datetime.combine(day, time(rnd.randint(7, 21), rnd.choice((0, 30))))
+        end = start + timedelta(minutes=rnd.choice((30, 60, 90, 120, 240)))
+        space = rnd.choice(SPACES)
+        if i % 2:
+            dtstart = f"DTSTART;TZID=America/New_York:{start:%Y%m%dT%H%M%S}"
+            dtend = f"DTEND;TZID=America/New_York:{end:%Y%m%dT%H%M%S}"
+        else:
+            dtstart = f"DTSTART:{start:%Y%m%dT%H%M%S}Z"
+            dtend = f"DTEND:{end:%Y%m%dT%H%M%S}Z"
+        description = f"Booked by member {rnd.randint(1, 900)} for project work\\, tools and setup. Spaces: {space}"
+        lines += [
+            'BEGIN:VEVENT',
+            f"UID:{i}-{seed}@skedda.com",
+            f"DTSTAMP:{today:%Y%m%d}T000000Z",
+            dtstart,
+            dtend,
+            f"SUMMARY:{rnd.choice(('Booking', 'Reserved', 'Class setup'))} {i}",
+        ]
+        # Fold long descriptions at 75 octets like real feeds
+        folded = 'DESCRIPTION:' + description
+        lines.append(folded[:75])
+        lines += [' ' + folded[j:j + 74] for j in range(75, len(folded), 74)]
+        lines += ['STATUS:CONFIRMED', 'END:VEVENT']
+    lines.append('END:VCALENDAR')
+    return ('\r\n'.join(lines) + '\r\n').encode('utf-8')
@@ -0,0 +1,282 @@
+"""
+Per-stage benchmarks over synthetic feeds.
+
+    python -m benchmarks.run                      # 100 and 10k items
+    python -m benchmarks.run --sizes 100,10k,100k --repeat 7
+    python -m benchmarks.run --stages parse,filter --fail-on-regression
+
+Each run is saved under benchmarks/results/ and compared with the
+previous full run (results/latest.json, or --compare FILE). Stages whose
+median got more than --threshold slower are flagged.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Keep the benchmarked app off the shared/persisted snapshot file
+os.environ.setdefault('SNAPSHOT_SHARED', 'false')
+os.environ.setdefault('SNAPSHOT_PERSIST', 'false')
+
+from benchmarks.generators import make_skedda_ical, make_wild_apricot_json, parse_size
+from benchmarks.stub_server import SKEDDA_PATH, WILD_APRICOT_PATH, start_stub_server
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# Calls shorter than this are repeated inside one sample
+MIN_SAMPLE_SECONDS = 0.002
+
+
+class BodyResponse:
+    """The parts of requests.Response the parsers use, over an in-memory body"""
+
+    def __init__(self, body: bytes):
+        self.content = body
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size: int = 1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+
+def measure(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """min/median/mean milliseconds per call over repeat samples"""
+    started = time.perf_counter()
+    fn()
+    first = time.perf_counter() - started
+    number = 1 if first >= MIN_SAMPLE_SECONDS else int(MIN_SAMPLE_SECONDS / max(first, 1e-7)) + 1
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - started) / number * 1000)
+    return {
+        'min_ms': round(min(samples), 4),
+        'median_ms': round(statistics.median(samples), 4),
+        'mean_ms': round(statistics.fmean(samples), 4),
+        'runs': repeat,
+        'calls_per_run': number,
+    }
+
+
+def build_stages(count: int, base_url: str) -> List[Tuple[str, str, Callable[[], object], int]]:
+    """(group, stage name, zero-argument callable, items handled) per stage"""
+    from app import create_app
+    from app.data_fetchers import ical_stream, skedda, wild_apricot
+    from app.data_fetchers.http_client import ConditionalFetcher
+    from app.processors import filter as filter_module
+    from app.processors import incremental, merger, normalizer, organizer
+    from app.processors.availability import AvailabilityIndex
+    from app.processors.conflicts import build_report
+    from app.processors.index import DateIndex, LocationIndex
+    from app.processors.query import compile_query
+    from app.utils import qrcode_gen, query_parser
+    from flask import render_template
+
+    app = create_app()
+    wa_body = make_wild_apricot_json(count)
+    sk_body = make_skedda_ical(count)
+    wa_url = base_url + WILD_APRICOT_PATH
+    sk_url = base_url + SKEDDA_PATH
+
+    # Inputs for each stage are prepared outside the timed calls
+    wa_records = json.loads(wa_body)['events']
+    events_raw = wild_apricot.parse_events_response(BodyResponse(wa_body))
+    vevents = list(ical_stream.iter_vevents(
+        ical_stream.iter_lines(BodyResponse(sk_body).iter_content(64 * 1024)),
+        horizon=skedda.reservation_horizon()
+    ))
+    reservations_raw = [r for r in map(skedda.parse_raw_vevent, vevents) if r]
+    events, reservations, state, _ = incremental.renormalize(events_raw, reservations_raw)
+    # The same feeds parsed again, as the next refresh sees them (equal, not identical, records)
+    events_refetched = wild_apricot.parse_events_response(BodyResponse(wa_body))
+    reservations_refetched = [r for r in map(skedda.parse_raw_vevent, vevents) if r]
+    items = merger.merge_events_and_reservations(events, reservations)
+    date_index, location_index = DateIndex(items), LocationIndex(items)
+    month = query_parser.parse_query_params({'range': 'this-month'})
+    month_query = compile_query(month)
+    month_location = compile_query(query_parser.parse_query_params({'range': 'this-month', 'location': 'classroom'}))
+    organized_month = month_query.run_indexed(date_index, location_index)
+    availability = AvailabilityIndex(items)
+    afternoon = datetime.combine(datetime.now().date(), datetime.min.time()).replace(hour=12)
+
+    def fetch(url, parse):
+        # A fresh fetcher every call, so the body is transferred and parsed
+        return ConditionalFetcher('bench', parse).fetch(url, 60)
+
+    warm_wa = ConditionalFetcher('bench', wild_apricot.parse_events_response)
+    warm_wa.fetch(wa_url, 60)
+
+    components = None
+    try:
+        from icalendar import Calendar
+        components = Calendar.from_ical(sk_body).walk('VEVENT')
+    except ImportError:
+        pass
+
+    qr_urls = [f"http://localhost:8000/display?range=today&location=space-{i}" for i in range(50)]
+
+    def cold_qr(output):
+        qrcode_gen._render_qr_code.cache_clear()
+        for url in qr_urls:
+            qrcode_gen.generate_qr_code(url, output)
+
+    def render(template):
+        with app.test_request_context('/display'):
+            return render_template(template, items_by_date=organized_month, params=month, qr_code='',
+                                   current_url='/display', snapshot=None, base_url='',
+                                   signature=None, stream_url=None)
+
+    month_items = sum(len(group) for group in organized_month.values())
+    stages = [
+        ('fetch', 'fetch.wild_apricot', lambda: fetch(wa_url, wild_apricot.parse_events_response), count),
+        ('fetch', 'fetch.skedda', lambda: fetch(sk_url, skedda.parse_ical_response), count),
+        ('fetch', 'fetch.not_modified', lambda: warm_wa.fetch(wa_url, 60), count),
+        ('parse', 'parse.wild_apricot_response', lambda: wild_apricot.parse_events_response(BodyResponse(wa_body)), count),
+        ('parse', 'parse_event_data', lambda: [wild_apricot.parse_event_data(r) for r in wa_records], count),
+        ('parse', 'parse.skedda_response', lambda: skedda.parse_ical_response(BodyResponse(sk_body)), count),
+        ('parse', 'parse_raw_vevent', lambda: [skedda.parse_raw_vevent(e) for e in vevents], len(vevents)),
+    ]
+    if components is not None:
+        stages.append(('parse', 'parse_vevent', lambda: [skedda.parse_vevent(c) for c in components], len(components)))
+    stages += [
+        ('normalize', 'normalize_event', lambda: [normalizer.normalize_event(e) for e in events_raw], len(events_raw)),
+        ('normalize', 'normalize_reservation',
+         lambda: [normalizer.normalize_reservation(r) for r in reservations_raw], len(reservations_raw)),
+        ('normalize', 'renormalize.cold', lambda: incremental.renormalize(events_raw, reservations_raw), len(items)),
+        ('normalize', 'renormalize.warm',
+         lambda: incremental.renormalize(events_refetched, reservations_refetched, state), len(items)),
+        ('filter', 'filter_by_source', lambda: filter_module.filter_by_source(items, 'skedda'), len(items)),
+        ('filter', 'filter_by_location', lambda: filter_module.filter_by_location(items, 'classroom'), len(items)),
+        ('filter', 'filter_by_date_range',
+         lambda: filter_module.filter_by_date_range(items, date_range='this-month'), len(items)),
+        ('filter', 'filter_past_events', lambda: filter_module.filter_past_events(items), len(items)),
+        ('filter', 'organize_by_date', lambda: organizer.organize_by_date(items), len(items)),
+        ('filter', 'index.build', lambda: (DateIndex(items), LocationIndex(items)), len(items)),
+        ('filter', 'query.run', lambda: month_query.run(items), len(items)),
+        ('filter', 'query.run_indexed', lambda: month_query.run_indexed(date_index, location_index), len(items)),
+        ('filter', 'query.run_indexed.location',
+         lambda: month_location.run_indexed(date_index, location_index), len(items)),
+        ('filter', 'availability.build', lambda: AvailabilityIndex(items), len(items)),
+        ('filter', 'availability.at', lambda: availability.at(afternoon), len(items)),
+        ('filter', 'availability.between',
+         lambda: availability.between(afternoon, afternoon.replace(hour=17)), len(items)),
+        ('filter', 'conflicts.build', lambda: build_report(items), len(items)),
+        ('qr', 'qr.png.cold', lambda: cold_qr('png'), len(qr_urls)),
+        ('qr', 'qr.svg.cold', lambda: cold_qr('svg'), len(qr_urls)),
+        ('qr', 'qr.cached', lambda: qrcode_gen.generate_qr_code(qr_urls[0]), 1),
+        ('render', 'render.desktop', lambda: render('desktop.html'), month_items),
+        ('render', 'render.kiosk', lambda: render('kiosk.html'), month_items),
+        ('render', 'render.mobile', lambda: render('mobile.html'), month_items),
+    ]
+    return stages
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(RESULTS_DIR), stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def compare(current: Dict, previous: Dict, threshold: float) -> List[str]:
+    """Print median changes per stage; returns the regressed stage names"""
+    regressions = []
+    print(f"\nCompared with {previous['meta'].get('revision')} ({previous['meta'].get('started')}):")
+    for size, stages in current['results'].items():
+        before = previous['results'].get(size, {})
+        for name, result in stages.items():
+            if name not in before:
+                continue
+            ratio = result['median_ms'] / before[name]['median_ms'] if before[name]['median_ms'] else 1.0
+            flag = ''
+            if ratio > 1 + threshold:
+                flag = '  REGRESSION'
+                regressions.append(f"{size}:{name}")
+            elif ratio < 1 - threshold:
+                flag = '  faster'
+            print(f"  {size:>5} {name:<32} {before[name]['median_ms']:>11.3f} -> {result['median_ms']:>11.3f} ms"
+                  f"  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='100,10k', help='comma-separated feed sizes (100, 10k, 100k, or numbers)')
+    parser.add_argument('--repeat', type=int, default=5, help='samples per stage')
+    parser.add_argument('--stages', default='', help='only these groups/stages (comma-separated prefixes)')
+    parser.add_argument('--output', help='result file (default: results/<time>-<revision>.json)')
+    parser.add_argument('--compare', help='earlier result file (default: results/latest.json)')
+    parser.add_argument('--threshold', type=float, default=0.2, help='slowdown ratio counted as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true', help='exit 1 when a stage regressed')
+    args = parser.parse_args(argv)
+
+    wanted = [s.strip() for s in args.stages.split(',') if s.strip()]
+    started = datetime.now()
+    report = {
+        'meta': {
+            'started': started.isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+        },
+        'results': {},
+    }
+
+    for size in [s.strip() for s in args.sizes.split(',') if s.strip()]:
+        count = parse_size(size)
+        server, base_url = start_stub_server(count)
+        try:
+            print(f"\n{size} items per feed")
+            results = report['results'][size] = {}
+            for group, name, fn, items in build_stages(count, base_url):
+                if wanted and not any(name.startswith(w) or group == w for w in wanted):
+                    continue
+                result = measure(fn, args.repeat)
+                result['items'] = items
+                if items:
+                    result['us_per_item'] = round(result['median_ms'] * 1000 / items, 3)
+                results[name] = result
+                print(f"  {name:<32} {result['median_ms']:>11.3f} ms  (min {result['min_ms']:.3f}, {items} items)")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    latest = os.path.join(RESULTS_DIR, 'latest.json')
+    previous_path = args.compare or latest
+    regressions = []
+    if os.path.exists(previous_path):
+        with open(previous_path) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{started:%Y%m%d-%H%M%S}-{report['meta']['revision'] or 'unknown'}.json"
+    )
+    # Partial runs (--stages) are saved but do not replace the baseline
+    for path in (output,) if wanted else (output, latest):
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+    print(f"\nSaved {output}")
+
+    if regressions:
+        print(f"{len(regressions)} stage(s) regressed more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1 if args.fail_on_regression else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
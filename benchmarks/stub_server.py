@@ -0,0 +1,96 @@
+"""
+Local stand-in for both upstreams.
+
+Serves generated feeds at /wild-apricot.json and /skedda.ics with ETag and
+Last-Modified, answering conditional requests with 304 like the real
+servers. Point the app at it with
+
+    python -m benchmarks.stub_server --size 10k --port 8765
+    WILD_APRICOT_URL=http://127.0.0.1:8765/wild-apricot.json \\
+    SKEDDA_ICAL_URL=http://127.0.0.1:8765/skedda.ics python run.py
+
+?delay=<seconds> on either URL slows the response down, for deadline tests.
+"""
+import argparse
+import hashlib
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+from urllib.parse import parse_qs, urlparse
+from benchmarks.generators import make_skedda_ical, make_wild_apricot_json, parse_size
+
+WILD_APRICOT_PATH = '/wild-apricot.json'
+SKEDDA_PATH = '/skedda.ics'
+
+
+class Feed:
+    """One generated body with its validators"""
+
+    def __init__(self, body: bytes, content_type: str):
+        self.body = body
+        self.content_type = content_type
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        self.last_modified = formatdate(time.time(), usegmt=True)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    feeds: Dict[str, Feed] = {}
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        feed = self.feeds.get(url.path)
+        if feed is None:
+            self.send_error(404)
+            return
+        delay = parse_qs(url.query).get('delay')
+        if delay:
+            time.sleep(float(delay[0]))
+        if self.headers.get('If-None-Match') == feed.etag:
+            self.send_response(304)
+            self.send_header('ETag', feed.etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', feed.content_type)
+        self.send_header('Content-Length', str(len(feed.body)))
+        self.send_header('ETag', feed.etag)
+        self.send_header('Last-Modified', feed.last_modified)
+        self.end_headers()
+        self.wfile.write(feed.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(count: int, host: str = '127.0.0.1', port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Serve feeds of count items each from a daemon thread; returns (server, base URL)"""
+    handler = type('Handler', (StubHandler,), {'feeds': {
+        WILD_APRICOT_PATH: Feed(make_wild_apricot_json(count), 'application/json'),
+        SKEDDA_PATH: Feed(make_skedda_ical(count), 'text/calendar; charset=utf-8'),
+    }})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='stub-upstream', daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', default='100', help='items per feed: 100, 10k, 100k or a number')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(parse_size(args.size), args.host, args.port)
+    print(f"Wild Apricot: {base_url}{WILD_APRICOT_PATH}")
+    print(f"Skedda:       {base_url}{SKEDDA_PATH}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def local_tz():
+    """Run a test with the server's local time zone set to the given name"""
+    saved = os.environ.get('TZ')
+
+    def use(name: str):
+        os.environ['TZ'] = name
+        time.tzset()
+
+    yield use
+    if saved is None:
+        os.environ.pop('TZ', None)
+    else:
+        os.environ['TZ'] = saved
+    time.tzset()
+
+
+@pytest.fixture(params=['America/New_York', 'UTC', 'Asia/Tokyo'])
+def zone(request, local_tz):
+    """Run a test once per server time zone"""
+    local_tz(request.param)
+    return request.param
+
+
+@pytest.fixture
+def event():
+    """Factory of normalized Wild Apricot events in one space"""
+    from app.processors.normalizer import normalize_event
+
+    def make(start: datetime, title: str = 'Woodworking 101', location: str = 'Wood Shop'):
+        return normalize_event({
+            'source': 'wild-apricot', 'id': 'e1', 'title': title,
+            'location': location, 'start_datetime': start,
+        })
+
+    return make
+
+
+@pytest.fixture
+def reservation():
+    """Factory of normalized Skedda reservations in one space"""
+    from app.processors.normalizer import normalize_reservation
+
+    def make(start: datetime, end: datetime, title: str = 'Woodworking 101', space: str = 'Wood Shop'):
+        return normalize_reservation({
+            'source': 'skedda', 'id': 'r1', 'title': title,
+            'space': space, 'start_datetime': start, 'end_datetime': end,
+        })
+
+    return make
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone
+
+from app.processors.availability import AvailabilityIndex, item_interval
+
+EDT = timezone(timedelta(hours=-4))
+
+
+def test_reservation_is_converted_to_local_time(zone, reservation):
+    booking = reservation(datetime(2026, 10, 20, 14, tzinfo=timezone.utc), datetime(2026, 10, 20, 15, tzinfo=timezone.utc))
+    expected = datetime(2026, 10, 20, 14, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    assert booking.start_datetime == expected
+    assert booking.start_time == expected.strftime('%I:%M %p')
+    assert booking.start_date == expected.strftime('%Y-%m-%d')
+
+
+def test_availability_sees_utc_booking_at_local_time(local_tz, reservation):
+    local_tz('America/New_York')
+    booking = reservation(datetime(2026, 10, 20, 14, tzinfo=timezone.utc), datetime(2026, 10, 20, 15, tzinfo=timezone.utc))
+    assert item_interval(booking) == (datetime(2026, 10, 20, 10), datetime(2026, 10, 20, 11))
+    index = AvailabilityIndex([booking])
+    [space] = index.at(datetime(2026, 10, 20, 10, 30))
+    assert space.busy
+    [space] = index.at(datetime(2026, 10, 20, 14, 30))
+    assert not space.busy
+
+
+def test_offset_event_occupies_its_instant(zone, event):
+    class_ = event(datetime(2026, 10, 20, 10, tzinfo=EDT))
+    start = datetime(2026, 10, 20, 14, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    assert item_interval(class_, 60) == (start, start + timedelta(minutes=60))
+
+
+def test_offset_event_day_time_and_interval_agree(local_tz, event):
+    # 22:00 EDT is 11:00 the next day in Tokyo
+    local_tz('Asia/Tokyo')
+    class_ = event(datetime(2026, 10, 20, 22, tzinfo=EDT))
+    assert class_.day == datetime(2026, 10, 21).date()
+    assert class_.start_date == '2026-10-21'
+    assert class_.start_time == '11:00 AM'
+    assert class_.sort_key == datetime(2026, 10, 21, 11)
+    assert item_interval(class_, 60) == (datetime(2026, 10, 21, 11), datetime(2026, 10, 21, 12))
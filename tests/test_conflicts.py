@@ -0,0 +1,37 @@
+from datetime import date, datetime, timedelta, timezone
+
+from app.processors import conflicts, merger
+
+EDT = timezone(timedelta(hours=-4))
+DAY = date(2026, 10, 20)
+
+
+def test_mixed_utc_and_offset_times_conflict(zone, event, reservation):
+    # 10:00 EDT and 14:00 UTC are the same instant
+    items = [
+        event(datetime(2026, 10, 20, 10, tzinfo=EDT)),
+        reservation(datetime(2026, 10, 20, 14, tzinfo=timezone.utc), datetime(2026, 10, 20, 15, tzinfo=timezone.utc)),
+    ]
+    report = conflicts.build_report(items, day=DAY)
+    assert len(report) == 1
+    found = report.conflicts[0]
+    assert found.start == datetime(2026, 10, 20, 14, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    assert found.end == datetime(2026, 10, 20, 15, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+
+
+def test_offset_times_that_differ_do_not_conflict(zone, event, reservation):
+    # Same wall-clock hour, four hours apart
+    items = [
+        event(datetime(2026, 10, 20, 14, tzinfo=EDT)),
+        reservation(datetime(2026, 10, 20, 14, tzinfo=timezone.utc), datetime(2026, 10, 20, 15, tzinfo=timezone.utc)),
+    ]
+    assert len(conflicts.build_report(items, day=DAY, default_minutes=60)) == 0
+
+
+def test_dedupe_folds_mixed_utc_and_offset_duplicates(zone, event, reservation):
+    items = [
+        event(datetime(2026, 10, 20, 10, tzinfo=EDT)),
+        reservation(datetime(2026, 10, 20, 14, tzinfo=timezone.utc), datetime(2026, 10, 20, 15, tzinfo=timezone.utc)),
+    ]
+    merged = merger.dedupe(items, window=900, min_similarity=0.8)
+    assert len(merged) == 1
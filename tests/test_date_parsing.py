@@ -0,0 +1,32 @@
+from datetime import date, datetime
+
+from app.utils import date_parsing
+
+
+def fallbacks():
+    return date_parsing.parse_stats()['fallback']
+
+
+def test_exact_formats_skip_dateutil():
+    before = fallbacks()
+    assert date_parsing.parse_date('2026-10-20') == date(2026, 10, 20)
+    assert date_parsing.parse_date('10/20/2026') == date(2026, 10, 20)
+    assert date_parsing.parse_datetime('2026-10-20 07:30 PM') == datetime(2026, 10, 20, 19, 30)
+    assert fallbacks() == before
+
+
+def test_every_fallback_is_counted():
+    before = fallbacks()
+    for _ in range(3):
+        assert date_parsing.parse_date('October 20, 2026') == date(2026, 10, 20)
+        assert date_parsing.parse_datetime('October 20, 2026 7pm') == datetime(2026, 10, 20, 19)
+    assert fallbacks() == before + 6
+
+
+def test_partial_dates_follow_today(monkeypatch):
+    from dateutil import parser as date_parser
+
+    parse = date_parser.parse
+    for today in (datetime(2026, 10, 20), datetime(2027, 1, 5)):
+        monkeypatch.setattr(date_parser, 'parse', lambda text, **kw: parse(text, default=today, **kw))
+        assert date_parsing.parse_date('Oct 20') == date(today.year, 10, 20)
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from app.data_fetchers import http_client
+from app.data_fetchers.http_client import ConditionalFetcher
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b'', headers=None):
+        self.status_code = status_code
+        self.content = body
+        self.headers = headers or {}
+        self.raw = None
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeUpstream:
+    """Answers 304 to a matching If-None-Match, else the current body"""
+
+    def __init__(self):
+        self.body, self.etag = b'[]', '"v1"'
+        self.sent = []
+
+    def get(self, url, timeout, headers):
+        self.sent.append(dict(headers))
+        if headers.get('If-None-Match') == self.etag:
+            return FakeResponse(304)
+        return FakeResponse(200, self.body, {'ETag': self.etag})
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    fake = FakeUpstream()
+    monkeypatch.setattr(http_client, 'get_session', lambda: fake)
+    return fake
+
+
+def test_not_modified_reuses_result(upstream):
+    fetcher = ConditionalFetcher('feed', FakeResponse.json)
+    upstream.body = b'[1, 2]'
+    assert fetcher.fetch('http://upstream/feed', 5) == [1, 2]
+    assert fetcher.fetch('http://upstream/feed', 5) == [1, 2]
+    assert upstream.sent[-1] == {'If-None-Match': '"v1"'}
+    assert fetcher.stats()['not_modified'] == 1
+
+
+def test_failed_parse_keeps_previous_validators(upstream):
+    fetcher = ConditionalFetcher('feed', FakeResponse.json)
+    upstream.body = b'[1, 2]'
+    assert fetcher.fetch('http://upstream/feed', 5) == [1, 2]
+
+    upstream.body, upstream.etag = b'[1, 2', '"v2"'
+    with pytest.raises(ValueError):
+        fetcher.fetch('http://upstream/feed', 5)
+    # The next request must not claim to have v2, or the 304 would hand
+    # back [1, 2] as if v2 had parsed
+    with pytest.raises(ValueError):
+        fetcher.fetch('http://upstream/feed', 5)
+    assert upstream.sent[-1] == {'If-None-Match': '"v1"'}
+
+    upstream.body = b'[1, 2, 3]'
+    assert fetcher.fetch('http://upstream/feed', 5) == [1, 2, 3]
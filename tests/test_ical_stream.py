@@ -0,0 +1,69 @@
+from datetime import date
+
+from app.data_fetchers import ical_stream
+
+FEED = """BEGIN:VCALENDAR
+BEGIN:VTIMEZONE
+TZID:America/New_York
+BEGIN:STANDARD
+DTSTART:19701101T020000
+END:STANDARD
+END:VTIMEZONE
+BEGIN:VEVENT
+UID:past
+DTSTART:20260901T100000Z
+SUMMARY:Long gone
+END:VEVENT
+BEGIN:VEVENT
+UID:weekly
+DTSTART;TZID=America/New_York:20260901T100000
+SUMMARY:Weekly class
+RRULE:FREQ=WEEKLY
+END:VEVENT
+BEGIN:VEVENT
+UID:inside
+SUMMARY:Laser
+  training
+DTSTART;VALUE=DATE:20261020
+BEGIN:VALARM
+DTSTART:20990101T000000Z
+SUMMARY:alarm
+END:VALARM
+RESOURCES:Laser Room
+END:VEVENT
+BEGIN:VEVENT
+UID:later
+DTSTART:20270301T100000Z
+BEGIN:VALARM
+SUMMARY:alarm
+END:VALARM
+SUMMARY:Too far out
+END:VEVENT
+BEGIN:VEVENT
+UID:undated
+SUMMARY:No start
+END:VEVENT
+END:VCALENDAR
+"""
+
+HORIZON = (date(2026, 10, 1), date(2026, 12, 31))
+
+
+def vevents(horizon=None):
+    return list(ical_stream.iter_vevents(FEED.splitlines(), horizon=horizon))
+
+
+def test_without_horizon_every_event_is_kept():
+    assert [ical_stream.first_value(e, 'UID') for e in vevents()] == ['past', 'weekly', 'inside', 'later', 'undated']
+
+
+def test_horizon_keeps_events_inside_it_and_earlier_recurring_ones():
+    events = vevents(HORIZON)
+    assert [ical_stream.first_value(e, 'UID') for e in events] == ['weekly', 'inside', 'undated']
+
+
+def test_properties_skip_nested_components_and_unfold():
+    inside = vevents(HORIZON)[1]
+    assert ical_stream.first_value(inside, 'SUMMARY') == 'Laser training'
+    assert inside['DTSTART'] == [({'VALUE': 'DATE'}, '20261020')]
+    assert ical_stream.first_value(inside, 'RESOURCES') == 'Laser Room'
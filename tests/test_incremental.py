@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta, timezone
+
+from app.processors.incremental import renormalize
+
+
+def feeds():
+    """Freshly built raw records, equal to (but not the same objects as) the last call's"""
+    start = datetime(2026, 10, 20, 10, tzinfo=timezone(timedelta(hours=-4)))
+    events = [
+        {'source': 'wild-apricot', 'id': f'e{n}', 'title': f'Class {n}', 'location': 'Wood Shop',
+         'start_datetime': start + timedelta(days=n)}
+        for n in range(3)
+    ]
+    reservations = [
+        {'source': 'skedda', 'id': f'r{n}', 'title': f'Booking {n}', 'space': 'Laser Room',
+         'start_datetime': start + timedelta(days=n), 'end_datetime': start + timedelta(days=n, hours=1)}
+        for n in range(3)
+    ]
+    return events, reservations
+
+
+def test_unchanged_records_reuse_their_items():
+    events, reservations, state, delta = renormalize(*feeds())
+    assert len(delta.added) == 6
+    again_events, again_reservations, _, delta = renormalize(*feeds(), state)
+    assert not delta
+    assert all(a is b for a, b in zip(events + reservations, again_events + again_reservations))
+
+
+def test_changed_and_removed_records_show_in_delta():
+    _, _, state, _ = renormalize(*feeds())
+    events, reservations = feeds()
+    events[1]['title'] = 'Class 1 (moved)'
+    del reservations[2]
+    _, _, _, delta = renormalize(events, reservations, state)
+    assert [item.title for item in delta.changed] == ['Class 1 (moved)']
+    assert [item.id for item in delta.removed] == ['r2']
+    assert not delta.added
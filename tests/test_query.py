@@ -0,0 +1,127 @@
+"""
+Differential tests: the compiled single-pass Query (run and run_indexed)
+must give exactly what the filter chain it replaced gives, i.e.
+filter_by_source -> filter_by_location -> filter_by_date_range ->
+filter_past_events -> organize_by_date, over randomized items and query
+parameters. Recurring masters are compared against the chain run over
+their occurrences in the query's window.
+"""
+import random
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from app.processors import filter as filters
+from app.processors import normalizer
+from app.processors.index import DateIndex, LocationIndex
+from app.processors.organizer import organize_by_date
+from app.processors.query import compile_query
+from app.processors.recurrence import RecurrenceExpander
+from app.utils.query_parser import parse_query_params
+
+SPACES = ['Events Bay', 'Classroom A', 'Laser Room', 'wood shop', None, '  Lounge ']
+LOCATIONS = [None, 'events', 'ROOM', ' lounge ', 'zzz', 'a']
+RANGES = [None, 'today', 'tomorrow', 'this-week', 'next-week', 'this-month', 'next-month', 'next-10-days']
+RULES = ['FREQ=WEEKLY;COUNT=6', 'FREQ=DAILY;INTERVAL=3', 'FREQ=WEEKLY;BYDAY=MO,TH;UNTIL=20990101T000000', 'FREQ=MONTHLY']
+
+
+def random_items(rnd: random.Random, count: int):
+    today = date.today()
+    items = []
+    for n in range(count):
+        day = today + timedelta(days=rnd.randint(-40, 70))
+        start = datetime.combine(day, time(rnd.randint(0, 23), rnd.choice([0, 30])))
+        if rnd.random() < .5:
+            raw = {'source': 'wild-apricot', 'id': str(n), 'title': f'Event {rnd.randint(0, 9)}',
+                   'location': rnd.choice(SPACES)}
+            kind = rnd.random()
+            if kind < .6:
+                raw['start_datetime'] = start
+            elif kind < .8:
+                raw['start_date'] = day.strftime('%m/%d/%Y')
+                raw['start_time'] = start.strftime('%I:%M %p')
+            elif kind < .9:
+                raw['start_date'] = day.strftime('%m/%d/%Y')
+            items.append(normalizer.normalize_event(raw))
+            continue
+        raw = {'source': 'skedda', 'feed': rnd.choice(['skedda', 'annex']), 'id': f'sk{n}',
+               'title': f'Booking {rnd.randint(0, 9)}', 'space': rnd.choice(SPACES)}
+        if rnd.random() < .9:
+            raw.update(start_datetime=start, end_datetime=start + timedelta(hours=1))
+        if 'start_datetime' in raw and rnd.random() < .05:
+            raw['rrule'] = rnd.choice(RULES)
+            items.append(normalizer.normalize_reservation(raw))
+            # Sometimes move one of its occurrences with a RECURRENCE-ID override
+            if rnd.random() < .5:
+                moved = start + timedelta(days=7)
+                items.append(normalizer.normalize_reservation(dict(
+                    raw, rrule=None, title='Moved', recurrence_id=moved,
+                    start_datetime=moved + timedelta(hours=2), end_datetime=moved + timedelta(hours=3)
+                )))
+            continue
+        items.append(normalizer.normalize_reservation(raw))
+    return items
+
+
+def random_args(rnd: random.Random):
+    today = date.today()
+    args = {'source': rnd.choice(['all', 'skedda', 'wild-apricot', 'annex'])}
+    if rnd.random() < .6:
+        args['range'] = rnd.choice(RANGES[1:])
+    location = rnd.choice(LOCATIONS)
+    if location:
+        args[rnd.choice(['location', 'space'])] = location
+    if rnd.random() < .25:
+        args['date'] = (today + timedelta(days=rnd.randint(-10, 20))).isoformat()
+    if rnd.random() < .3:
+        args['start'] = (today + timedelta(days=rnd.randint(-30, 10))).isoformat()
+    if rnd.random() < .3:
+        args['end'] = (today + timedelta(days=rnd.randint(-5, 40))).isoformat()
+    return args
+
+
+def filter_chain(items, params, recurring_window):
+    """The pre-Query pipeline, with recurring masters replaced by their occurrences"""
+    plain = [item for item in items if not item.recurrence]
+    recurring = [item for item in items if item.recurrence or item.recurrence_id is not None]
+    plain += RecurrenceExpander(recurring).occurrences(*recurring_window)
+    found = filters.filter_by_source(plain, params['source'])
+    if params['location']:
+        found = filters.filter_by_location(found, params['location'])
+    found = filters.filter_by_date_range(
+        found,
+        start_date=params['start'],
+        end_date=params['end'],
+        date_range=params['range'],
+        specific_date=params['date']
+    )
+    if params['filter_past']:
+        found = filters.filter_past_events(found, True)
+    return organize_by_date(found)
+
+
+def described(organized):
+    """Comparable form of a date -> items result (occurrences are new objects each expansion)"""
+    return {
+        day: [(item.feed, item.id, item.recurrence_id, item.start_datetime, item.title) for item in group]
+        for day, group in organized.items()
+        if group
+    }
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_query_matches_filter_chain(seed):
+    rnd = random.Random(seed)
+    items = random_items(rnd, 200)
+    date_index, location_index = DateIndex(items), LocationIndex(items)
+    recurring = RecurrenceExpander(items)
+    for _ in range(200):
+        args = random_args(rnd)
+        params = parse_query_params(args)
+        params['filter_past'] = rnd.random() < .7
+        query = compile_query(params)
+
+        expected = described(filter_chain(items, params, (query.start, query.end)))
+        assert described(query.run(items)) == expected, args
+        assert described(query.run_indexed(date_index, location_index, recurring)) == expected, args
+        assert described(query.run_indexed(date_index, recurring=recurring)) == expected, args